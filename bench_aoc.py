@@ -0,0 +1,196 @@
+"""
+Benchmarks for the Advent of Code solutions.
+
+    python bench_aoc.py --update          # time every part and record bench_baseline.json
+    python bench_aoc.py                   # time again, exit with 1 on a regression
+    python bench_aoc.py -d 4 11 --tolerance 0.5
+
+Every part is timed on generated inputs of increasing size (LADDERS) and an empirical
+scaling exponent is fitted to time ~ bytes ** exponent. A part regresses when it is
+slower than its baseline by more than the tolerance at some size, or when its exponent
+grew by more than the exponent tolerance (a linear part turning quadratic).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Sequence
+
+from generators import write_input
+from utils import load_challenge
+
+DEFAULT_BASELINE = str(Path(__file__).parent / "bench_baseline.json")
+
+# sizes are in the unit of each day's generator (lines, cards, grid side, ...)
+LADDERS: dict[int, tuple[int, ...]] = {
+    1: (1000, 2000, 4000, 8000),
+    2: (1000, 2000, 4000, 8000),
+    3: (50, 100, 200, 400),
+    4: (500, 1000, 2000, 4000),
+    5: (10, 20, 40, 80),
+    6: (2, 4, 8, 16),
+    7: (1000, 2000, 4000, 8000),
+    8: (1000, 2000, 4000, 8000),
+    9: (500, 1000, 2000, 4000),
+    10: (40, 80, 160, 320),
+    11: (50, 100, 150, 200),
+}
+
+# parts that cannot be timed on a ladder, with the reason
+SKIPPED: dict[tuple[int, int], str] = {}
+
+# timings below this are noise, they never count as a regression
+NOISE_FLOOR = 1e-3
+
+
+@dataclass
+class PartBenchmark:
+    day: int
+    part: int
+    sizes: list[int]
+    num_bytes: list[int]
+    times: list[float]
+    exponent: float
+
+    @property
+    def name(self) -> str:
+        return f"day{self.day}.part{self.part}"
+
+
+def fit_scaling_exponent(num_bytes: Sequence[int], times: Sequence[float]) -> float:
+    """Least squares slope of log(time) against log(bytes)."""
+    xs = [math.log(n) for n in num_bytes]
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def time_part(func, filename: str, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(filename)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_day(day: int, directory: str, repeat: int = 3) -> list[PartBenchmark]:
+    challenge = load_challenge(day)
+    filenames = [
+        write_input(day, size, os.path.join(directory, f"day{day}_{size}.txt"))
+        for size in LADDERS[day]
+    ]
+    num_bytes = [os.path.getsize(filename) for filename in filenames]
+    benchmarks = []
+    for part in (1, 2):
+        if (day, part) in SKIPPED:
+            continue
+        func = getattr(challenge, f"part{part}")
+        times = [time_part(func, filename, repeat) for filename in filenames]
+        benchmarks.append(
+            PartBenchmark(
+                day,
+                part,
+                list(LADDERS[day]),
+                num_bytes,
+                times,
+                fit_scaling_exponent(num_bytes, times),
+            )
+        )
+    return benchmarks
+
+
+def find_regressions(
+    current: Sequence[PartBenchmark],
+    baseline: dict[str, dict],
+    tolerance: float = 0.25,
+    exponent_tolerance: float = 0.3,
+) -> list[str]:
+    regressions = []
+    for benchmark in current:
+        if benchmark.name not in baseline:
+            continue
+        reference = baseline[benchmark.name]
+        reference_times = dict(zip(reference["sizes"], reference["times"]))
+        for size, elapsed in zip(benchmark.sizes, benchmark.times):
+            if size not in reference_times or elapsed < NOISE_FLOOR:
+                continue
+            if elapsed > reference_times[size] * (1 + tolerance):
+                regressions.append(
+                    f"{benchmark.name} at size {size}: {elapsed:.4f}s, "
+                    f"baseline {reference_times[size]:.4f}s"
+                )
+        if benchmark.exponent > reference["exponent"] + exponent_tolerance:
+            regressions.append(
+                f"{benchmark.name} scales as bytes^{benchmark.exponent:.2f}, "
+                f"baseline bytes^{reference['exponent']:.2f}"
+            )
+    return regressions
+
+
+def format_report(benchmarks: Sequence[PartBenchmark]) -> str:
+    lines = []
+    for benchmark in benchmarks:
+        timings = "  ".join(
+            f"{size}: {elapsed:.4f}s"
+            for size, elapsed in zip(benchmark.sizes, benchmark.times)
+        )
+        lines.append(
+            f"{benchmark.name:<12} exponent {benchmark.exponent:5.2f}  {timings}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the solutions")
+    parser.add_argument("-d", "--days", type=int, nargs="+", default=list(LADDERS))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update", action="store_true", help="record the timings as the baseline"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--exponent-tolerance", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    benchmarks = []
+    with tempfile.TemporaryDirectory() as directory:
+        for day in args.days:
+            benchmarks.extend(benchmark_day(day, directory, args.repeat))
+    print(format_report(benchmarks))
+
+    if args.update:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update({benchmark.name: asdict(benchmark) for benchmark in benchmarks})
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run with --update", file=sys.stderr)
+        return 1
+    with open(args.baseline) as f:
+        regressions = find_regressions(
+            benchmarks, json.load(f), args.tolerance, args.exponent_tolerance
+        )
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
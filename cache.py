@@ -0,0 +1,132 @@
+"""
+On-disk cache of solved answers.
+
+An answer is stored under the day, the part, the SHA-256 of the input bytes and a hash
+of the solution source (the day module and utils.py), so changing either the input or
+the code misses the cache. Once the cache holds more than `max_bytes`, the least
+recently used answers are evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+from typing import Any, Callable
+
+DEFAULT_CACHE_DIR = ".aoc_cache"
+DEFAULT_MAX_BYTES = 1 << 20
+
+
+def file_digest(filename: str) -> str:
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def solution_digest(day: int) -> str:
+    digest = hashlib.sha256()
+    for module_name in (f"day{day}", "utils"):
+        with open(importlib.util.find_spec(module_name).origin, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(
+        self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def input_key(self, day: int, filename: str) -> str:
+        """
+        Digest of the input and of the solution source of a day, the costly part of
+        a key: compute it once and pass it to every lookup of the same input.
+        """
+        return f"{day}:{file_digest(filename)}:{solution_digest(day)}"
+
+    def key(
+        self, day: int, part: int, filename: str, input_key: str | None = None
+    ) -> str:
+        if input_key is None:
+            input_key = self.input_key(day, filename)
+        return hashlib.sha256(f"{part}:{input_key}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(
+        self, day: int, part: int, filename: str, input_key: str | None = None
+    ) -> Any | None:
+        return self._load(self.key(day, part, filename, input_key))
+
+    def put(
+        self,
+        day: int,
+        part: int,
+        filename: str,
+        answer: Any,
+        input_key: str | None = None,
+    ) -> None:
+        self._store(
+            self.key(day, part, filename, input_key), day, part, filename, answer
+        )
+
+    def solve(
+        self, day: int, part: int, filename: str, func: Callable[[str], Any]
+    ) -> Any:
+        key = self.key(day, part, filename)
+        answer = self._load(key)
+        if answer is None:
+            answer = func(filename)
+            self._store(key, day, part, filename, answer)
+        return answer
+
+    def _load(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                answer = json.load(f)["answer"]
+            # the modification time doubles as the last access time for the LRU order
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return answer
+
+    def _store(self, key: str, day: int, part: int, filename: str, answer: Any):
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {"day": day, "part": part, "input": filename, "answer": answer}
+        # write then rename, concurrent runners never see half an entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f, default=int)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.directory, name))
@@ -35,10 +35,12 @@ In this example, the calibration values of these four lines are 12, 38, 15, and
 
 Consider your entire calibration document. What is the sum of all the calibration values?
 """
-import re
+import os
+from collections import deque
+from itertools import repeat
 from typing import Iterable
 
-from utils import AOCChallenge
+from utils import AOCChallenge, iter_lines, line_aligned_chunks
 
 
 def first_true(iterable: Iterable, default=False, pred=None):
@@ -55,15 +57,22 @@ def first_true(iterable: Iterable, default=False, pred=None):
     return next(filter(pred, iterable), default)
 
 
-def part1(filename: str) -> int:
+def parse_file(filename: str) -> list[str]:
     with open(filename) as f:
-        calibration_document = f.read().strip()
-        return sum(
-            int(
-                f"{first_true(line, pred=str.isdigit)}{first_true(reversed(line), pred=str.isdigit)}"
-            )
-            for line in calibration_document.splitlines()
+        return f.read().strip().splitlines()
+
+
+def solve_part1(calibration_lines: Iterable[str]) -> int:
+    return sum(
+        int(
+            f"{first_true(line, pred=str.isdigit)}{first_true(reversed(line), pred=str.isdigit)}"
         )
+        for line in calibration_lines
+    )
+
+
+def part1(filename: str) -> int:
+    return solve_part1(parse_file(filename))
 
 
 # --- Part Two ---
@@ -85,27 +94,196 @@ STRING_NUMBERS = {
 }
 
 
+class DigitAutomaton:
+    """
+    Aho-Corasick automaton over a set of words, compiled to a full transition table.
+
+    first() feeds characters one at a time and returns the value of the first word
+    that ends, so a line is scanned once, without slicing, and only up to its first
+    digit.
+    """
+
+    def __init__(self, words: dict[str, int]):
+        self.transitions: list[dict[str, int]] = [{}]
+        self.outputs: list[int | None] = [None]
+        for word, value in words.items():
+            state = 0
+            for char in word:
+                if char not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.outputs.append(None)
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            self.outputs[state] = value
+
+        # breadth first, the failure state of a state is always complete before it
+        alphabet = set("".join(words))
+        failure = [0] * len(self.transitions)
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            for char in alphabet:
+                child = self.transitions[state].get(char)
+                fallback = self.transitions[failure[state]].get(char, 0)
+                if child is None:
+                    self.transitions[state][char] = fallback if state else 0
+                    continue
+                failure[child] = fallback if state else 0
+                if self.outputs[child] is None:
+                    self.outputs[child] = self.outputs[failure[child]]
+                queue.append(child)
+
+    def first(self, chars: Iterable[str]) -> int | None:
+        transitions, outputs = self.transitions, self.outputs
+        state = 0
+        for char in chars:
+            # characters outside of every word send the automaton back to the root
+            state = transitions[state].get(char, 0)
+            if (value := outputs[state]) is not None:
+                return value
+        return None
+
+
+DIGIT_VALUES = {str(digit): digit for digit in range(10)} | {
+    word: int(digit) for word, digit in STRING_NUMBERS.items()
+}
+# no spelled digit contains another one, so the first word to end is also the
+# first to start; the backward automaton reads the reversed words from the line end
+FORWARD_DIGITS = DigitAutomaton(DIGIT_VALUES)
+BACKWARD_DIGITS = DigitAutomaton(
+    {word[::-1]: value for word, value in DIGIT_VALUES.items()}
+)
+
+
+def spelled_calibration_value(line: str) -> int:
+    first_digit = FORWARD_DIGITS.first(line)
+    last_digit = BACKWARD_DIGITS.first(reversed(line))
+    if first_digit is None or last_digit is None:
+        raise ValueError(f"no digit in {line!r}")
+    return 10 * first_digit + last_digit
+
+
+def solve_part2(calibration_lines: Iterable[str]) -> int:
+    return sum(map(spelled_calibration_value, calibration_lines))
+
+
 def part2(filename: str) -> int:
-    with open(filename) as f:
-        calibration_document = f.read().strip()
-        cleaned_lines = []
-        for line in calibration_document.splitlines():
-            cleaned_line = []
-            for index, char in enumerate(line):
-                if re_match := re.match(
-                    r"one|two|three|four|five|six|seven|eight|nine", line[index:]
-                ):
-                    cleaned_line.append(STRING_NUMBERS.get(re_match.group(0)))
-                else:
-                    cleaned_line.append(char)
-            cleaned_lines.append("".join(cleaned_line))
+    return solve_part2(parse_file(filename))
+
+
+def stream_lines(
+    filename: str, start: int = 0, end: int | None = None
+) -> Iterable[str]:
+    return (line for line in map(str.strip, iter_lines(filename, start, end)) if line)
+
+
+def stream_part1(filename: str) -> int:
+    return solve_part1(stream_lines(filename))
+
+
+def stream_part2(filename: str) -> int:
+    return solve_part2(stream_lines(filename))
+
+
+def vectorized_calibration_sum(document, spelled_digits: bool = False) -> int:
+    """
+    Sum of the calibration values of a document given as a uint8 array.
+
+    Digits (and with spelled_digits, the starts of spelled-out digits) are found with
+    whole-array comparisons, then reduced to the first and last digit of every line.
+    Lines without any digit count as 0.
+    """
+    import numpy as np
+
+    # the digit value starting at every position, anything that is not a digit
+    # wraps around to 10 or more
+    values = document - np.uint8(ord("0"))
+    if spelled_digits:
+        # the four bytes starting at every position read as one little-endian integer,
+        # a strided view over the padded document, so a word is one comparison
+        padded = np.concatenate((document, np.zeros(4, dtype=np.uint8)))
+        windows = np.ndarray((len(document),), dtype="<u4", buffer=padded, strides=(1,))
+        three_byte_windows = windows & 0xFFFFFF
+        for word, digit in STRING_NUMBERS.items():
+            prefix = word[:4].encode()
+            candidates = three_byte_windows if len(prefix) == 3 else windows
+            matches = np.flatnonzero(candidates == int.from_bytes(prefix, "little"))
+            if len(word) > 4:
+                # the rare four-byte matches are completed one byte at a time
+                matches = matches[padded[matches + 4] == ord(word[4])]
+            values[matches] = int(digit)
+
+    positions = np.flatnonzero(values < 10)
+    if not len(positions):
+        return 0
+    # positions are sorted, so the digits of a line are one contiguous segment
+    lines = np.searchsorted(np.flatnonzero(document == ord("\n")), positions)
+    segment_starts = np.flatnonzero(np.append(True, lines[1:] != lines[:-1]))
+    segment_ends = np.append(segment_starts[1:], len(positions)) - 1
+    first_digits = values[positions[segment_starts]].astype(np.int64)
+    last_digits = values[positions[segment_ends]].astype(np.int64)
+    return int(10 * first_digits.sum() + last_digits.sum())
+
+
+def vectorized_part1(filename: str) -> int:
+    import numpy as np
+
+    return vectorized_calibration_sum(np.fromfile(filename, dtype=np.uint8))
+
+
+def vectorized_part2(filename: str) -> int:
+    import numpy as np
+
+    return vectorized_calibration_sum(
+        np.fromfile(filename, dtype=np.uint8), spelled_digits=True
+    )
+
+
+def chunk_calibration_sum(
+    filename: str, start: int, end: int, spelled_digits: bool = False
+) -> int:
+    solve = solve_part2 if spelled_digits else solve_part1
+    return solve(stream_lines(filename, start, end))
+
+
+def parallel_calibration_sum(
+    filename: str,
+    spelled_digits: bool = False,
+    max_workers: int | None = None,
+    chunk_size: int = 1 << 24,
+) -> int:
+    """
+    Sums the calibration values of newline aligned byte ranges in worker processes.
+
+    Every worker streams its own range from the file, so no process holds more than
+    a line at a time, and there are several ranges per worker to balance the load.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_workers = max_workers or os.cpu_count() or 1
+    num_chunks = max(4 * max_workers, os.path.getsize(filename) // chunk_size)
+    chunks = line_aligned_chunks(filename, num_chunks)
+    with ProcessPoolExecutor(max_workers) as pool:
         return sum(
-            int(
-                f"{first_true(line, pred=str.isdigit)}{first_true(reversed(line), pred=str.isdigit)}"
+            pool.map(
+                chunk_calibration_sum,
+                repeat(filename),
+                [start for start, _ in chunks],
+                [end for _, end in chunks],
+                repeat(spelled_digits),
             )
-            for line in cleaned_lines
         )
 
 
-day1 = AOCChallenge(1, part1, part2)
+def parallel_part1(filename: str, max_workers: int | None = None) -> int:
+    return parallel_calibration_sum(filename, max_workers=max_workers)
+
+
+def parallel_part2(filename: str, max_workers: int | None = None) -> int:
+    return parallel_calibration_sum(
+        filename, spelled_digits=True, max_workers=max_workers
+    )
+
+
+day1 = AOCChallenge(1, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = [day1]
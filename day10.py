@@ -2,15 +2,13 @@ from __future__ import annotations
 
 from collections import deque, defaultdict
 from enum import Enum
-from sys import maxsize, setrecursionlimit
+from functools import cached_property
+from sys import maxsize
 from typing import Literal
 
-from termcolor import colored
-
 from utils import AOCChallenge
 
 inf = maxsize
-setrecursionlimit(10000)
 
 
 class Direction(Enum):
@@ -363,6 +361,11 @@ class Grid(list[list[Direction]]):
             current = pred[current]
         return loop
 
+    @cached_property
+    def loop_distances(self) -> dict[tuple[int, int], int]:
+        # both parts need the BFS over the loop, so it is only run once per grid
+        return self.find_shortest_path_length()
+
     def find_shortest_path_length(self) -> dict[tuple[int, int], int]:
         sr, sc = self.find_start_position()
         q = deque([(sr, sc)])
@@ -383,6 +386,8 @@ class Grid(list[list[Direction]]):
         return dists
 
     def print_loop(self, loop):
+        from termcolor import colored
+
         loop_set = set(loop)
         for row_index, row in enumerate(self):
             print(
@@ -405,20 +410,27 @@ def calculate_polygon_area(coordinates: list[tuple[int, int]]) -> float:
     )
 
 
-def part1(filename: str) -> int:
+def parse_file(filename: str) -> Grid:
     with open(filename) as f:
-        grid = Grid.parse_input(f.read())
-        dists = grid.find_shortest_path_length()
-        return max(dists.values())
+        return Grid.parse_input(f.read())
+
+
+def solve_part1(grid: Grid) -> int:
+    return max(grid.loop_distances.values())
+
+
+def solve_part2(grid: Grid) -> int:
+    loop = grid.trace_loop(grid.loop_distances)
+    return int(calculate_polygon_area(loop) - 0.5 * len(loop) + 1)
+
+
+def part1(filename: str) -> int:
+    return solve_part1(parse_file(filename))
 
 
 def part2(filename: str) -> int:
-    with open(filename) as f:
-        grid = Grid.parse_input(f.read())
-        dists = grid.find_shortest_path_length()
-        loop = grid.trace_loop(dists)
-        return int(calculate_polygon_area(loop) - 0.5 * len(loop) + 1)
+    return solve_part2(parse_file(filename))
 
 
-day10 = AOCChallenge(10, part1, part2)
+day10 = AOCChallenge(10, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = [day10]
@@ -86,14 +86,29 @@ def all_pairs_shortest_paths_manhattan(
     return {(a, b): distance_func(a, b) for a, b in combinations(coords_galaxies, 2)}
 
 
-def solve(filename: str, factor: int = 2):
+def parse_file(filename: str) -> list[str]:
     with open(filename) as f:
-        universe = f.read().strip().splitlines()
-        dists = all_pairs_shortest_paths_manhattan(
-            find_coords_galaxies(universe),
-            get_weighted_distance_function(universe, factor=factor),
-        )
-        return sum(dists.values())
+        return f.read().strip().splitlines()
+
+
+def sum_distances(universe: list[str], factor: int = 2) -> int:
+    dists = all_pairs_shortest_paths_manhattan(
+        find_coords_galaxies(universe),
+        get_weighted_distance_function(universe, factor=factor),
+    )
+    return sum(dists.values())
+
+
+def solve(filename: str, factor: int = 2):
+    return sum_distances(parse_file(filename), factor)
+
+
+def solve_part1(universe: list[str]) -> int:
+    return sum_distances(universe, factor=2)
+
+
+def solve_part2(universe: list[str]) -> int:
+    return sum_distances(universe, factor=1_000_000)
 
 
 def part1(filename: str):
@@ -104,5 +119,5 @@ def part2(filename: str):
     return solve(filename, factor=1_000_000)
 
 
-day11 = AOCChallenge(11, part1, part2)
+day11 = AOCChallenge(11, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = [day11]
@@ -50,13 +50,20 @@ Determine which games would have been possible if the bag had been loaded with o
 
 from __future__ import annotations
 
-import re
+import math
+from bisect import bisect_left, bisect_right
+from array import array
 from dataclasses import dataclass
 from enum import Enum
-from typing import Final
+from itertools import groupby
+from operator import itemgetter
+from typing import TYPE_CHECKING, Final, Iterable, Iterator
 
 from utils import AOCChallenge
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class ColorChoice(Enum):
     red = "red"
@@ -64,77 +71,308 @@ class ColorChoice(Enum):
     blue = "blue"
 
 
-@dataclass(frozen=True)
-class ColorPick:
-    color: ColorChoice
-    quantity: int
+MAX_RED_CUBES: Final[int] = 12
+MAX_GREEN_CUBES: Final[int] = 13
+MAX_BLUE_CUBES: Final[int] = 14
+BAG_LIMITS: Final[tuple[int, int, int]] = (
+    MAX_RED_CUBES,
+    MAX_GREEN_CUBES,
+    MAX_BLUE_CUBES,
+)
+
+# column of every colour in the per-colour arrays
+COLOR_INDEX: Final[dict[str, int]] = {
+    color.value: index for index, color in enumerate(ColorChoice)
+}
+
+
+# a pick as (game id, round within the game, COLOR_INDEX column, quantity)
+Token = tuple[int, int, int, int]
+
+# first byte of every colour name, with the colour column and the length of the name
+COLOR_BYTES: Final[dict[int, tuple[int, int]]] = {
+    ord(name[0]): (index, len(name)) for name, index in COLOR_INDEX.items()
+}
+
+
+def tokenize_games(lines: Iterable[bytes]) -> Iterator[Token]:
+    """
+    Yields a token for every colour pick of the game records.
+
+    Each line is read byte by byte, once: digits accumulate into a number that
+    becomes the game id at the colon and a quantity at the next colour name, and
+    semicolons count the rounds. Nothing is split, decoded or matched by a regex.
+    """
+    for line in lines:
+        game_id, round_index, number = None, 0, 0
+        index, length = 0, len(line)
+        while index < length:
+            byte = line[index]
+            if 48 <= byte <= 57:  # 0-9
+                number = number * 10 + byte - 48
+            elif game_id is None:
+                if byte == 58:  # :
+                    game_id, number = number, 0
+            elif byte == 59:  # ;
+                round_index += 1
+            elif (color := COLOR_BYTES.get(byte)) is not None:
+                yield game_id, round_index, color[0], number
+                number = 0
+                index += color[1]
+                continue
+            index += 1
+
+
+def stream_tokens(filename: str) -> Iterator[Token]:
+    with open(filename, "rb") as f:
+        yield from tokenize_games(f)
+
+
+def possible_game_ids(
+    tokens: Iterable[Token], limits: tuple[int, int, int] = BAG_LIMITS
+) -> Iterator[int]:
+    """Ids of the games possible under the limits, reading one game at a time."""
+    for game_id, game_tokens in groupby(tokens, key=itemgetter(0)):
+        possible = True
+        for _, round_tokens in groupby(game_tokens, key=itemgetter(1)):
+            totals = [0] * len(limits)
+            for _, _, color, quantity in round_tokens:
+                totals[color] += quantity
+            if any(total > limit for total, limit in zip(totals, limits)):
+                possible = False
+        if possible:
+            yield game_id
+
+
+def minimum_set_powers(tokens: Iterable[Token]) -> Iterator[int]:
+    for _, game_tokens in groupby(tokens, key=itemgetter(0)):
+        maximum = [0] * len(COLOR_INDEX)
+        for _, _, color, quantity in game_tokens:
+            maximum[color] = max(maximum[color], quantity)
+        yield math.prod(maximum)
 
 
 @dataclass
-class GameRound:
-    picks: list[ColorPick]
+class GameColumns:
+    """
+    Parsed games as parallel arrays instead of one object per game, round and pick.
+
+    game_ids holds one entry per game; the pick_* arrays hold one entry per colour
+    pick, with the index of its game (into game_ids), of its round (counted over all
+    games), of its colour (COLOR_INDEX) and the quantity shown.
+    """
+
+    game_ids: np.ndarray
+    round_games: np.ndarray
+    pick_rounds: np.ndarray
+    pick_colors: np.ndarray
+    pick_quantities: np.ndarray
+
+    @staticmethod
+    def from_tokens(tokens: Iterable[Token]) -> GameColumns:
+        import numpy as np
+
+        game_ids, round_games = array("q"), array("q")
+        pick_rounds, pick_colors, pick_quantities = array("q"), array("b"), array("q")
+        last_game = last_round = None
+        for game_id, round_index, color, quantity in tokens:
+            if game_id != last_game:
+                game_ids.append(game_id)
+                last_game, last_round = game_id, None
+            if round_index != last_round:
+                round_games.append(len(game_ids) - 1)
+                last_round = round_index
+            pick_rounds.append(len(round_games) - 1)
+            pick_colors.append(color)
+            pick_quantities.append(quantity)
+        return GameColumns(
+            *(
+                np.frombuffer(column, dtype=column.typecode)
+                for column in (
+                    game_ids,
+                    round_games,
+                    pick_rounds,
+                    pick_colors,
+                    pick_quantities,
+                )
+            )
+        )
+
+    def round_totals(self) -> np.ndarray:
+        """Cubes of every colour shown in every round, shape (rounds, colours)."""
+        import numpy as np
+
+        num_colors = len(COLOR_INDEX)
+        return np.bincount(
+            self.pick_rounds * num_colors + self.pick_colors,
+            weights=self.pick_quantities,
+            minlength=len(self.round_games) * num_colors,
+        ).reshape(-1, num_colors)
+
+    def maximum_cubes(self) -> np.ndarray:
+        """Most cubes of every colour shown in a single pick, shape (games, colours)."""
+        import numpy as np
+
+        maximum = np.zeros((len(self.game_ids), len(COLOR_INDEX)), dtype=np.int64)
+        np.maximum.at(
+            maximum,
+            (self.round_games[self.pick_rounds], self.pick_colors),
+            self.pick_quantities,
+        )
+        return maximum
+
+    def required_cubes(self) -> np.ndarray:
+        """Fewest cubes of every colour for each game to be possible, (games, colours)."""
+        import numpy as np
+
+        required = np.zeros((len(self.game_ids), len(COLOR_INDEX)), dtype=np.int64)
+        np.maximum.at(required, self.round_games, self.round_totals().astype(np.int64))
+        return required
+
+    def possible_id_sum(self, limits: tuple[int, int, int] = BAG_LIMITS) -> int:
+        import numpy as np
+
+        possible = (self.required_cubes() <= np.array(limits)).all(axis=1)
+        return int(self.game_ids[possible].sum())
+
+    def minimum_set_power_sum(self) -> int:
+        return int(self.maximum_cubes().prod(axis=1).sum())
+
+
+# most cells of the dense id sum table of a BagLimitIndex, 32 MiB of int64
+MAX_TABLE_CELLS: Final[int] = 1 << 22
 
 
 @dataclass
-class Game:
-    game_id: int
-    game_rounds: list[GameRound]
+class BagLimitIndex:
+    """
+    Answers "sum of the ids of the games possible under limits (r, g, b)" for many
+    limits, in logarithmic time per query while the table below fits and in
+    polylogarithmic time per query otherwise.
+
+    A game is possible when its required cubes are dominated by the limits. When the
+    required cubes take few distinct values per colour, the id sums are binned on the
+    grid of those values and accumulated along the three axes: the answer to a query
+    is the single cell at the last grid value below each limit. A grid of more than
+    MAX_TABLE_CELLS cells is not built, the games are kept sorted by red instead and
+    every batch of queries is answered offline by sweep.
+    """
+
+    # sorted distinct required cubes per colour, the axes of the table
+    axes: tuple[np.ndarray, np.ndarray, np.ndarray]
+    # id_sums[i, j, k]: ids of the games needing at most the i-th red value, the j-th
+    # green value and the k-th blue value; index 0 of every axis stands for no game.
+    # None when the grid would be too large
+    id_sums: np.ndarray | None
+    # required cubes and ids of the games sorted by red, for the sweep without table
+    required: np.ndarray
+    game_ids: np.ndarray
 
     @staticmethod
-    def parse(game_description: str) -> Game:
+    def from_games(
+        games: GameColumns, max_table_cells: int = MAX_TABLE_CELLS
+    ) -> BagLimitIndex:
+        import numpy as np
+
+        required = games.required_cubes()
+        by_red = np.argsort(required[:, 0], kind="stable")
+        axes, cells = [], []
+        for color in range(len(COLOR_INDEX)):
+            values, indices = np.unique(required[:, color], return_inverse=True)
+            axes.append(values)
+            cells.append(indices + 1)
+        shape = tuple(len(values) + 1 for values in axes)
+        id_sums = None
+        if math.prod(shape) <= max_table_cells:
+            id_sums = np.zeros(shape, dtype=np.int64)
+            np.add.at(id_sums, tuple(cells), games.game_ids)
+            for axis in range(id_sums.ndim):
+                np.cumsum(id_sums, axis=axis, out=id_sums)
+        return BagLimitIndex(
+            tuple(axes),  # type: ignore[arg-type]
+            id_sums,
+            required[by_red],
+            games.game_ids[by_red],
+        )
+
+    def query_many(self, limits) -> np.ndarray:
+        """Possible id sums for an array of (red, green, blue) limits, shape (n, 3)."""
+        import numpy as np
+
+        limits = np.asarray(limits).reshape(-1, len(self.axes))
+        if self.id_sums is not None:
+            cells = tuple(
+                np.searchsorted(values, limits[:, color], side="right")
+                for color, values in enumerate(self.axes)
+            )
+            return self.id_sums[cells]
+
+        return np.array(self.sweep(limits.tolist()), dtype=np.int64)
+
+    def sweep(self, limits: list[list[int]]) -> list[int]:
         """
-        Parses a game string into a Game object
+        Answers a batch of limits without the table, in O((games + limits) log² games)
+        and O(games log games) memory.
 
-        :param game_description: The game string to parse
-        :return: A ColorGame object
+        Games and limits are swept in red order. The games within the red limit so far
+        are in a Fenwick tree over the green values, whose nodes are Fenwick trees over
+        the blue values of the games that reach them.
         """
-        game_id_str, *sets_str = game_description.split(":")
-        assert (
-            len(sets_str) == 1
-        ), f"Game description {game_description} should only have one set"
-        game_rounds = []
-        for round_str in sets_str[0].split(";"):
-            color_picks_in_round = []
-            for match in re.finditer(r"(\d+)(\s*)(blue|red|green)", round_str):
-                quantity = int(match.group(1))
-                color_name = match.group(3)
-                color_picks_in_round.append(
-                    ColorPick(ColorChoice[color_name], quantity)
-                )
-            game_rounds.append(GameRound(color_picks_in_round))
-        return Game(int(re.findall(r"(\d+)", game_id_str)[0]), game_rounds)
-
-
-MAX_RED_CUBES: Final[int] = 12
-MAX_GREEN_CUBES: Final[int] = 13
-MAX_BLUE_CUBES: Final[int] = 14
+        reds, greens, blues = (
+            zip(*self.required.tolist()) if len(self.required) else ((), (), ())
+        )
+        game_ids = self.game_ids.tolist()
+        green_values = sorted(set(greens))
+        green_ranks = [bisect_left(green_values, green) + 1 for green in greens]
+        # node_blues[i]: sorted blue values of the games that node i of the green tree
+        # covers, node_sums[i] the Fenwick tree of their id sums
+        node_blues: list[list[int]] = [[] for _ in range(len(green_values) + 1)]
+        for green_rank, blue in zip(green_ranks, blues):
+            node = green_rank
+            while node < len(node_blues):
+                node_blues[node].append(blue)
+                node += node & -node
+        node_blues = [sorted(set(values)) for values in node_blues]
+        node_sums = [[0] * (len(values) + 1) for values in node_blues]
+
+        id_sums = [0] * len(limits)
+        num_added = 0
+        for query in sorted(range(len(limits)), key=lambda query: limits[query][0]):
+            red, green, blue = limits[query]
+            while num_added < len(reds) and reds[num_added] <= red:
+                node = green_ranks[num_added]
+                while node < len(node_blues):
+                    sums = node_sums[node]
+                    cell = bisect_left(node_blues[node], blues[num_added]) + 1
+                    while cell < len(sums):
+                        sums[cell] += game_ids[num_added]
+                        cell += cell & -cell
+                    node += node & -node
+                num_added += 1
+            node = bisect_right(green_values, green)
+            while node:
+                sums = node_sums[node]
+                cell = bisect_right(node_blues[node], blue)
+                while cell:
+                    id_sums[query] += sums[cell]
+                    cell -= cell & -cell
+                node -= node & -node
+        return id_sums
+
+    def query(self, limits: tuple[int, int, int] = BAG_LIMITS) -> int:
+        return int(self.query_many([limits])[0])
+
+
+def parse_file(filename: str) -> GameColumns:
+    return GameColumns.from_tokens(stream_tokens(filename))
+
+
+def solve_part1(games: GameColumns) -> int:
+    return games.possible_id_sum()
 
 
 def part1(filename: str):
-    with open(filename) as f:
-        games = [Game.parse(game.strip()) for game in f.readlines() if game]
-        sum_games_ids = 0
-        for game in games:
-            game_valid = True
-            for game_round in game.game_rounds:
-                red_cubes, green_cubes, blue_cubes = 0, 0, 0
-                for color_pick in game_round.picks:
-                    if color_pick.color == ColorChoice.red:
-                        red_cubes += color_pick.quantity
-                    elif color_pick.color == ColorChoice.green:
-                        green_cubes += color_pick.quantity
-                    elif color_pick.color == ColorChoice.blue:
-                        blue_cubes += color_pick.quantity
-                if (
-                    red_cubes > MAX_RED_CUBES
-                    or green_cubes > MAX_GREEN_CUBES
-                    or blue_cubes > MAX_BLUE_CUBES
-                ):
-                    game_valid = False
-                    break
-            if game_valid:
-                sum_games_ids += game.game_id
-        return sum_games_ids
+    return solve_part1(parse_file(filename))
 
 
 # --- Part Two ---
@@ -165,25 +403,23 @@ def part1(filename: str):
 # For each game, find the minimum set of cubes that must have been present. What is the sum of the power of these sets?
 
 
+def solve_part2(games: GameColumns) -> int:
+    return games.minimum_set_power_sum()
+
+
 def part2(
     filename: str,
 ) -> int:
-    with open(filename) as f:
-        games = [Game.parse(game.strip()) for game in f.readlines() if game]
-        sum_powers = 0
-        for game in games:
-            red_cubes, green_cubes, blue_cubes = 0, 0, 0
-            for game_round in game.game_rounds:
-                for color_pick in game_round.picks:
-                    if color_pick.color == ColorChoice.red:
-                        red_cubes = max(red_cubes, color_pick.quantity)
-                    elif color_pick.color == ColorChoice.green:
-                        green_cubes = max(green_cubes, color_pick.quantity)
-                    elif color_pick.color == ColorChoice.blue:
-                        blue_cubes = max(blue_cubes, color_pick.quantity)
-            sum_powers += red_cubes * green_cubes * blue_cubes
-        return sum_powers
-
-
-day2 = AOCChallenge(2, part1, part2)
+    return solve_part2(parse_file(filename))
+
+
+def stream_part1(filename: str) -> int:
+    return sum(possible_game_ids(stream_tokens(filename)))
+
+
+def stream_part2(filename: str) -> int:
+    return sum(minimum_set_powers(stream_tokens(filename)))
+
+
+day2 = AOCChallenge(2, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = [day2]
@@ -39,11 +39,17 @@ Of course, the actual engine schematic is much larger.
 
  What is the sum of all of the part numbers in the engine schematic?
 """
-from utils import AOCChallenge
+from __future__ import annotations
 
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, Iterator
 
-def is_symbol(char: str):
-    return not char.isdigit() and char != "."
+from utils import AOCChallenge, digit_runs, iter_lines
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def parse_schematic(data: str):
@@ -53,103 +59,105 @@ def parse_schematic(data: str):
     return lines, (num_rows, num_cols)
 
 
-def sum_of_part_numbers_adjacent_to_symbols(
-    table: list[str],
-    row_index: int,
-    col_index: int,
-    span: int,
-    num_rows: int,
-    num_cols: int,
-) -> bool:
-    for index, symbol in enumerate(
-        table[row_index][col_index : col_index + span], col_index
-    ):
-        # grab the current row
-        row = table[row_index]
-        # check left, right
-        if index > 0 and is_symbol(row[index - 1]):
-            return True
-        if index < num_cols - 1 and is_symbol(row[index + 1]):
-            return True
-
-        # check up, down
-        if row_index > 0 and is_symbol(table[row_index - 1][index]):
-            return True
-        if row_index < num_rows - 1 and is_symbol(table[row_index + 1][index]):
-            return True
-
-        # check diagonals
-        if row_index > 0 and index > 0 and is_symbol(table[row_index - 1][index - 1]):
-            return True
-        if (
-            row_index > 0
-            and index < num_cols - 1
-            and is_symbol(table[row_index - 1][index + 1])
-        ):
-            return True
-        if (
-            row_index < num_rows - 1
-            and index > 0
-            and is_symbol(table[row_index + 1][index - 1])
-        ):
-            return True
-        if (
-            row_index < num_rows - 1
-            and index < num_cols - 1
-            and is_symbol(table[row_index + 1][index + 1])
-        ):
-            return True
-    return False
-
-
-def parse_number(s: str) -> str:
-    digits = []
-    for char in s:
-        if char.isdigit():
-            digits.append(char)
-        else:
-            return "".join(digits)
-    return "".join(digits)
-
-
-def parse_number_around(s: str, index: int) -> tuple[str, tuple[int, int]]:
-    digits = []
-    # traverse back and the digits
-    for char in s[index::-1]:
-        if char.isdigit():
-            digits.append(char)
-        else:
-            break
-    start_index = index - len(digits)
-    digits = digits[::-1]
-    # traverse forward and the digits
-    for char in s[index + 1 :]:
-        if char.isdigit():
-            digits.append(char)
-        else:
-            break
-    return "".join(digits), (start_index, start_index + len(digits))
+def schematic_grid(lines: list[str]) -> np.ndarray:
+    """
+    The schematic as a uint8 array of shape (rows, cols + 1). Every row ends with an
+    extra "." so that, flattened, no number runs on into the next row.
+    """
+    import numpy as np
+
+    return np.frombuffer(
+        "".join(line + "." for line in lines).encode(), dtype=np.uint8
+    ).reshape(len(lines), -1)
+
+
+def adjacency_mask(grid: np.ndarray) -> np.ndarray:
+    """Cells that hold or touch a symbol: the symbol mask dilated by one cell."""
+    import numpy as np
+
+    is_digit = (grid >= ord("0")) & (grid <= ord("9"))
+    padded = np.pad(~is_digit & (grid != ord(".")), 1)
+    # the 3x3 dilation is separable, first along the rows then along the columns
+    horizontal = padded[:, :-2] | padded[:, 1:-1] | padded[:, 2:]
+    return horizontal[:-2] | horizontal[1:-1] | horizontal[2:]
+
+
+@dataclass
+class SchematicIndex:
+    """
+    The schematic grid (see schematic_grid) with every number labelled once.
+
+    labels holds, for every cell, the id of the number written over it or -1, and
+    values, starts and ends give the value and the flat [start, end) span of every
+    number id. Both parts are answered from these arrays without rescanning rows.
+    """
+
+    grid: np.ndarray
+    labels: np.ndarray
+    values: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+
+    @staticmethod
+    def from_lines(lines: list[str]) -> SchematicIndex:
+        import numpy as np
+
+        grid = schematic_grid(lines)
+        cells = grid.ravel()
+        starts, ends, values = digit_runs(cells)
+        # digit cells come in span order, each span labelled with its number id
+        labels = np.full(grid.size, -1, dtype=np.int64)
+        labels[(cells >= ord("0")) & (cells <= ord("9"))] = np.repeat(
+            np.arange(len(values)), ends - starts
+        )
+        return SchematicIndex(grid, labels.reshape(grid.shape), values, starts, ends)
+
+    def part_number_sum(self) -> int:
+        import numpy as np
+
+        # touching[i]: cells before flat position i that touch a symbol, so a number
+        # touches one when the count grows over its span
+        touching = np.concatenate(([0], np.cumsum(adjacency_mask(self.grid).ravel())))
+        return int(self.values[touching[self.ends] > touching[self.starts]].sum())
+
+    def gear_ratio_sum(self) -> int:
+        import numpy as np
+
+        star_rows, star_cols = np.nonzero(self.grid == ord("*"))
+        padded = np.pad(self.labels, 1, constant_values=-1)
+        # labels of the eight neighbours of every star, one row per star
+        neighbours = np.sort(
+            np.stack(
+                [
+                    padded[star_rows + 1 + row_offset, star_cols + 1 + col_offset]
+                    for row_offset in (-1, 0, 1)
+                    for col_offset in (-1, 0, 1)
+                    if row_offset or col_offset
+                ],
+                axis=1,
+            ),
+            axis=1,
+        )
+        # the first occurrence of every label, a number touching a star twice counts once
+        distinct = neighbours >= 0
+        distinct[:, 1:] &= neighbours[:, 1:] != neighbours[:, :-1]
+        gears = distinct.sum(axis=1) == 2
+        pairs = neighbours[gears][distinct[gears]].reshape(-1, 2)
+        return int(self.values[pairs].prod(axis=1).sum())
+
+
+def parse_file(filename: str) -> SchematicIndex:
+    with open(filename) as f:
+        lines, _ = parse_schematic(f.read())
+        return SchematicIndex.from_lines(lines)
+
+
+def solve_part1(schematic: SchematicIndex) -> int:
+    return schematic.part_number_sum()
 
 
 def part1(filename: str):
-    with open(filename) as f:
-        sum_nums = 0
-        lines, (num_rows, num_cols) = parse_schematic(f.read())
-        for row, line in enumerate(lines):
-            col = 0
-            while col < len(line):
-                char = line[col]
-                if char.isdigit():
-                    number = parse_number(line[col:])
-                    span = len(number)
-                    if sum_of_part_numbers_adjacent_to_symbols(
-                        lines, row, col, span, num_rows, num_cols
-                    ):
-                        sum_nums += int(number)
-                    col = col + span
-                else:
-                    col += 1
-        return sum_nums
+    return solve_part1(parse_file(filename))
 
 
 # --- Part Two ---
@@ -189,68 +197,199 @@ def part1(filename: str):
 # Adding up all of the gear ratios produces 467835.
 
 
-def compute_gear_ratio(
-    table: list[str], row_index: int, col_index: int, num_rows: int, num_cols: int
-) -> int:
-    assert table[row_index][col_index] == "*", "Not a gear"
-    part_numbers = set()
-    # go round the gear and collect the part numbers
-    # check left, right
-    if col_index > 0 and table[row_index][col_index - 1].isdigit():
-        part_numbers.add(parse_number_around(table[row_index], col_index - 1))
-    if col_index < num_cols - 1 and table[row_index][col_index + 1].isdigit():
-        part_numbers.add(parse_number_around(table[row_index], col_index + 1))
-
-    # check up, down
-    if row_index > 0 and table[row_index - 1][col_index].isdigit():
-        part_numbers.add(parse_number_around(table[row_index - 1], col_index))
-    if row_index < num_rows - 1 and table[row_index + 1][col_index].isdigit():
-        part_numbers.add(parse_number_around(table[row_index + 1], col_index))
-
-    # check diagonals
-    if (
-        row_index > 0
-        and col_index > 0
-        and table[row_index - 1][col_index - 1].isdigit()
-    ):
-        part_numbers.add(parse_number_around(table[row_index - 1], col_index - 1))
-    if (
-        row_index > 0
-        and col_index < num_cols - 1
-        and table[row_index - 1][col_index + 1].isdigit()
-    ):
-        part_numbers.add(parse_number_around(table[row_index - 1], col_index + 1))
-    if (
-        row_index < num_rows - 1
-        and col_index > 0
-        and table[row_index + 1][col_index - 1].isdigit()
-    ):
-        part_numbers.add(parse_number_around(table[row_index + 1], col_index - 1))
-    if (
-        row_index < num_rows - 1
-        and col_index < num_cols - 1
-        and table[row_index + 1][col_index + 1].isdigit()
-    ):
-        part_numbers.add(parse_number_around(table[row_index + 1], col_index + 1))
-    if len(part_numbers) == 2:
-        num1, _ = part_numbers.pop()
-        num2, _ = part_numbers.pop()
-        return int(num1) * int(num2)
-    else:
-        return 0
+def solve_part2(schematic: SchematicIndex) -> int:
+    return schematic.gear_ratio_sum()
 
 
 def part2(filename: str) -> int:
-    with open(filename) as f:
-        sum_gear_ratios = 0
-        lines, (num_rows, num_cols) = parse_schematic(f.read())
-        for row, line in enumerate(lines):
-            for col, char in enumerate(line):
-                if char == "*":
-                    gear_ratio = compute_gear_ratio(lines, row, col, num_rows, num_cols)
-                    sum_gear_ratios += gear_ratio
-        return sum_gear_ratios
-
-
-day3 = AOCChallenge(3, part1, part2)
+    return solve_part2(parse_file(filename))
+
+
+Number = tuple[int, int, int, int]  # (row, start, end, value), end excluded
+
+
+class MutableSchematic:
+    """
+    A schematic that keeps the part number sum and gear ratio sum up to date while
+    single cells are edited.
+
+    Editing a cell can only change the numbers that touch its 3x3 neighbourhood (by
+    status, or by being split or merged) and the stars next to those numbers or on
+    the cell itself. Their contributions are taken out before the edit and added
+    back after it, looking at those few cells only.
+    """
+
+    def __init__(self, lines: list[str]):
+        self.rows = [list(line) for line in lines]
+        index = SchematicIndex.from_lines(lines)
+        self.part_number_sum = index.part_number_sum()
+        self.gear_ratio_sum = index.gear_ratio_sum()
+
+    @staticmethod
+    def parse(data: str) -> MutableSchematic:
+        lines, _ = parse_schematic(data)
+        return MutableSchematic(lines)
+
+    def cell(self, position: tuple[int, int]) -> tuple[int, int]:
+        """The position with negative indices counted from the end, like list indices."""
+        row, col = position
+        if not -len(self.rows) <= row < len(self.rows):
+            raise IndexError(f"row {row} out of range")
+        row %= len(self.rows)
+        if not -len(self.rows[row]) <= col < len(self.rows[row]):
+            raise IndexError(f"column {col} out of range")
+        return row, col % len(self.rows[row])
+
+    def __getitem__(self, position: tuple[int, int]) -> str:
+        row, col = self.cell(position)
+        return self.rows[row][col]
+
+    def __setitem__(self, position: tuple[int, int], char: str):
+        # the neighbourhoods below need the actual row and column
+        row, col = self.cell(position)
+        if len(char) != 1:
+            raise ValueError(f"a cell holds a single character, not {char!r}")
+        old_char = self.rows[row][col]
+        numbers_before = self.numbers_touching(row, col)
+        self.rows[row][col] = char
+        numbers_after = self.numbers_touching(row, col)
+        stars = self.cells_around_numbers(numbers_before | numbers_after)
+        stars.add((row, col))
+        gear_ratios_after = sum(map(self.gear_ratio, stars))
+        part_numbers_after = sum(n[3] for n in numbers_after if self.is_part(n))
+
+        self.rows[row][col] = old_char
+        self.gear_ratio_sum -= sum(map(self.gear_ratio, stars))
+        self.part_number_sum -= sum(n[3] for n in numbers_before if self.is_part(n))
+        self.rows[row][col] = char
+        self.gear_ratio_sum += gear_ratios_after
+        self.part_number_sum += part_numbers_after
+
+    def number_at(self, row: int, col: int) -> Number | None:
+        line = self.rows[row]
+        if not line[col].isdigit():
+            return None
+        start, end = col, col + 1
+        while start > 0 and line[start - 1].isdigit():
+            start -= 1
+        while end < len(line) and line[end].isdigit():
+            end += 1
+        return row, start, end, int("".join(line[start:end]))
+
+    def numbers_touching(self, row: int, col: int) -> set[Number]:
+        """The numbers with a cell in the 3x3 neighbourhood of (row, col)."""
+        numbers = set()
+        for r in range(max(row - 1, 0), min(row + 2, len(self.rows))):
+            for c in range(max(col - 1, 0), min(col + 2, len(self.rows[r]))):
+                if (number := self.number_at(r, c)) is not None:
+                    numbers.add(number)
+        return numbers
+
+    def cells_around_numbers(self, numbers: Iterable[Number]) -> set[tuple[int, int]]:
+        return {
+            (r, c)
+            for row, start, end, _ in numbers
+            for r in range(max(row - 1, 0), min(row + 2, len(self.rows)))
+            for c in range(max(start - 1, 0), min(end + 1, len(self.rows[r])))
+        }
+
+    def is_part(self, number: Number) -> bool:
+        row, start, end, _ = number
+        return any(
+            not self.rows[r][c].isdigit() and self.rows[r][c] != "."
+            for r, c in self.cells_around_numbers([number])
+        )
+
+    def gear_ratio(self, position: tuple[int, int]) -> int:
+        row, col = position
+        if self.rows[row][col] != "*":
+            return 0
+        numbers = self.numbers_touching(row, col)
+        if len(numbers) != 2:
+            return 0
+        (*_, first), (*_, second) = numbers
+        return first * second
+
+
+# symbols become "1", digits and dots "0", for the symbol bitset of a row
+SYMBOL_BITS = str.maketrans({char: "0" for char in "0123456789."})
+
+
+@dataclass
+class SchematicRow:
+    # (start, end, value) of every number, by column
+    numbers: list[tuple[int, int, int]] = field(default_factory=list)
+    # bit i is set when column i holds a symbol
+    symbols: int = 0
+    stars: list[int] = field(default_factory=list)
+
+    @staticmethod
+    def scan(line: str) -> SchematicRow:
+        marks = re.sub(r"[^0]", "1", line.translate(SYMBOL_BITS))
+        return SchematicRow(
+            [(m.start(), m.end(), int(m.group())) for m in re.finditer(r"\d+", line)],
+            int(marks[::-1], 2) if marks else 0,
+            [m.start() for m in re.finditer(r"\*", line)],
+        )
+
+    def numbers_around(self, col: int) -> list[int]:
+        # numbers are disjoint and sorted, at most three start before col + 2
+        last = bisect_right(self.numbers, (col + 2,))
+        return [
+            value
+            for start, end, value in self.numbers[max(0, last - 3) : last]
+            if end >= col
+        ]
+
+
+def window_sums(
+    previous: SchematicRow, current: SchematicRow, following: SchematicRow
+) -> tuple[int, int]:
+    """Part number sum and gear ratio sum of the middle row of a three-row window."""
+    near = previous.symbols | current.symbols | following.symbols
+    near = format(near | near << 1 | near >> 1, "b")[::-1]
+    part_sum = sum(
+        value for start, end, value in current.numbers if "1" in near[start:end]
+    )
+    gear_sum = 0
+    for col in current.stars:
+        around = [
+            value
+            for row in (previous, current, following)
+            for value in row.numbers_around(col)
+        ]
+        if len(around) == 2:
+            gear_sum += around[0] * around[1]
+    return part_sum, gear_sum
+
+
+def stream_schematic(lines: Iterable[str]) -> Iterator[tuple[int, int]]:
+    """
+    Yields the part number sum and gear ratio sum of every row while reading the
+    rows, holding no more than three of them at a time.
+    """
+    previous, current = SchematicRow(), None
+    for line in lines:
+        row = SchematicRow.scan(line)
+        if current is not None:
+            yield window_sums(previous, current, row)
+            previous = current
+        current = row
+    if current is not None:
+        yield window_sums(previous, current, SchematicRow())
+
+
+def stream_rows(filename: str) -> Iterator[str]:
+    return (line for line in map(str.strip, iter_lines(filename)) if line)
+
+
+def stream_part1(filename: str) -> int:
+    return sum(part_sum for part_sum, _ in stream_schematic(stream_rows(filename)))
+
+
+def stream_part2(filename: str) -> int:
+    return sum(gear_sum for _, gear_sum in stream_schematic(stream_rows(filename)))
+
+
+day3 = AOCChallenge(3, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = [day3]
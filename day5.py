@@ -125,14 +125,16 @@ What is the lowest location number that corresponds to any of the initial seed n
 
 from __future__ import annotations
 
-import itertools
-import sys
-from collections import Counter, defaultdict
+from bisect import bisect_right
 from dataclasses import dataclass
-from itertools import batched
-from operator import itemgetter
+from heapq import heappop, heappush
+from itertools import batched, pairwise
+from typing import Iterable
 
-from utils import extract_numbers, AOCChallenge
+from utils import extract_numbers_bulk, AOCChallenge
+
+# half-open [start, end) range of numbers
+Interval = tuple[int, int]
 
 
 @dataclass(frozen=True, slots=True)
@@ -157,6 +159,32 @@ class Mapping(list[RangeMap]):
                 return range_map.destination_start + (value - range_map.source_start)
         return value
 
+    def map_intervals(self, intervals: Iterable[Interval]) -> list[Interval]:
+        """
+        Images of half-open [start, end) intervals, split at the range boundaries.
+
+        Like map, the first range that holds a value wins and values outside of
+        every range keep their number.
+        """
+        unmapped, mapped = list(intervals), []
+        for range_map in self:
+            source_end = range_map.source_start + range_map.range_length
+            offset = range_map.destination_start - range_map.source_start
+            remaining = []
+            for start, end in unmapped:
+                overlap_start = max(start, range_map.source_start)
+                overlap_end = min(end, source_end)
+                if overlap_start >= overlap_end:
+                    remaining.append((start, end))
+                    continue
+                mapped.append((overlap_start + offset, overlap_end + offset))
+                if start < overlap_start:
+                    remaining.append((start, overlap_start))
+                if overlap_end < end:
+                    remaining.append((overlap_end, end))
+            unmapped = remaining
+        return mapped + unmapped
+
     def start(self):
         return min(range_map.source_start for range_map in self)
 
@@ -172,10 +200,113 @@ class Mapping(list[RangeMap]):
         return s
 
 
+@dataclass(frozen=True, slots=True)
+class CompiledMapping:
+    """
+    A Mapping as disjoint segments sorted by source start, looked up with bisect.
+
+    Segment i adds offsets[i] to the numbers of [starts[i], ends[i]), numbers between
+    the segments keep their number, as they do with Mapping.
+    """
+
+    src_name: str
+    dest_name: str
+    starts: list[int]
+    ends: list[int]
+    offsets: list[int]
+
+    @staticmethod
+    def from_mapping(mapping: Mapping) -> CompiledMapping:
+        boundaries = sorted(
+            {
+                boundary
+                for range_map in mapping
+                for boundary in (
+                    range_map.source_start,
+                    range_map.source_start + range_map.range_length,
+                )
+            }
+        )
+        by_source_start = sorted(
+            range(len(mapping)), key=lambda index: mapping[index].source_start
+        )
+        # overlapping ranges are cut at every boundary, and each piece goes to the
+        # first range of the list that holds it, the one Mapping.map would pick:
+        # a heap of the (list index, source end) of the ranges started so far
+        covering: list[tuple[int, int]] = []
+        starts, ends, offsets = [], [], []
+        num_started = 0
+        for segment_start, segment_end in pairwise(boundaries):
+            while (
+                num_started < len(mapping)
+                and mapping[by_source_start[num_started]].source_start <= segment_start
+            ):
+                range_map = mapping[by_source_start[num_started]]
+                heappush(
+                    covering,
+                    (
+                        by_source_start[num_started],
+                        range_map.source_start + range_map.range_length,
+                    ),
+                )
+                num_started += 1
+            while covering and covering[0][1] <= segment_start:
+                heappop(covering)
+            if not covering:
+                continue
+            range_map = mapping[covering[0][0]]
+            offset = range_map.destination_start - range_map.source_start
+            if ends and ends[-1] == segment_start and offsets[-1] == offset:
+                ends[-1] = segment_end
+            else:
+                starts.append(segment_start)
+                ends.append(segment_end)
+                offsets.append(offset)
+        return CompiledMapping(
+            mapping.src_name, mapping.dest_name, starts, ends, offsets
+        )
+
+    def map(self, value: int) -> int:
+        segment = bisect_right(self.starts, value) - 1
+        if segment >= 0 and value < self.ends[segment]:
+            return value + self.offsets[segment]
+        return value
+
+    def map_intervals(self, intervals: Iterable[Interval]) -> list[Interval]:
+        starts, ends, offsets = self.starts, self.ends, self.offsets
+        mapped = []
+        for start, end in intervals:
+            segment = bisect_right(starts, start) - 1
+            while start < end:
+                if segment + 1 < len(starts) and starts[segment + 1] <= start:
+                    segment += 1
+                elif segment >= 0 and start < ends[segment]:
+                    piece_end = min(end, ends[segment])
+                    offset = offsets[segment]
+                    mapped.append((start + offset, piece_end + offset))
+                    start = piece_end
+                else:
+                    # the gap up to the next segment keeps its numbers
+                    piece_end = (
+                        min(end, starts[segment + 1])
+                        if segment + 1 < len(starts)
+                        else end
+                    )
+                    mapped.append((start, piece_end))
+                    start = piece_end
+        return mapped
+
+    def start(self):
+        return self.starts[0]
+
+    def end(self):
+        return self.ends[-1]
+
+
 @dataclass
 class MappingPipeline:
     seeds: tuple[int]
-    mappings: list[Mapping]
+    mappings: list[Mapping | CompiledMapping]
 
     def map(self, value: int) -> int:
         assert self.mappings[0].src_name == "seed", self.mappings[0].src_name
@@ -185,6 +316,25 @@ class MappingPipeline:
                 break
         return value
 
+    def map_intervals(self, intervals: Iterable[Interval]) -> list[Interval]:
+        assert self.mappings[0].src_name == "seed", self.mappings[0].src_name
+        for current_mapping in self.mappings:
+            intervals = current_mapping.map_intervals(intervals)
+            if current_mapping.src_name == "location":
+                break
+        return list(intervals)
+
+    def compile(self) -> MappingPipeline:
+        return MappingPipeline(
+            self.seeds,
+            [
+                CompiledMapping.from_mapping(current_mapping)
+                if isinstance(current_mapping, Mapping)
+                else current_mapping
+                for current_mapping in self.mappings
+            ],
+        )
+
     def start(self):
         return self.mappings[0].start()
 
@@ -193,11 +343,15 @@ class MappingPipeline:
 
     @staticmethod
     def parse(data: str) -> MappingPipeline:
-        seeds_line, *rest = data.strip().splitlines()
+        data = data.strip()
+        seeds_line, *rest = data.splitlines()
+        # every number of the almanac in one pass, then sliced per line
+        numbers, offsets = extract_numbers_bulk(data)
+        numbers, offsets = numbers.tolist(), offsets.tolist()
         mappings = []
         current_mapping = None
 
-        for line in (line.strip() for line in rest):
+        for line_index, line in enumerate((line.strip() for line in rest), start=1):
             if not line:
                 if current_mapping:
                     mappings.append(current_mapping)
@@ -205,13 +359,14 @@ class MappingPipeline:
                 src_name, dest_name = line[:-5].split("-to-")
                 current_mapping = Mapping(src_name, dest_name)
             else:
-                res = extract_numbers(line)
-                dst, src, range_length = res
+                dst, src, range_length = numbers[
+                    offsets[line_index] : offsets[line_index + 1]
+                ]
                 current_mapping.append(RangeMap(src, dst, range_length))
         if current_mapping is not None and mappings[-1] != current_mapping:
             mappings.append(current_mapping)
 
-        seeds = extract_numbers(seeds_line)
+        seeds = tuple(numbers[offsets[0] : offsets[1]])
 
         return MappingPipeline(seeds, mappings)
 
@@ -223,60 +378,28 @@ class MappingPipeline:
     def minimum(self):
         return min(self.map(seed) for seed in self.seeds)
 
-    def _instance_compute_approximate_minimum(
-        self, granularity: int = 100_000, to_consider: int = 3
-    ) -> tuple[int, int]:
-        intervals = self.gen_intervals()
-        minimum = min(itertools.chain(*intervals))
-        maximum = max(itertools.chain(*intervals))
-
-        if maximum - minimum <= 1000_000:
-            granularity = 1
-            to_consider = 1
-
-        ranges_granular = list(
-            itertools.chain.from_iterable(
-                range(start, stop + 1, granularity) for (start, stop) in intervals
-            )
-        )
-        approx_minima = list(
-            sorted(
-                ((seed, self.map(seed)) for seed in ranges_granular),
-                key=itemgetter(1),
-            ),
-        )
-        approx_minima = approx_minima[:to_consider]
-        absolute_minimum = approx_minima[0]
-        for current_minimum_seed, _ in approx_minima:
-            for seed in range(
-                max(minimum, current_minimum_seed - granularity // 2),
-                min(maximum, current_minimum_seed + granularity // 2),
-            ):
-                location = self.map(seed)
-                if location < absolute_minimum[1]:
-                    absolute_minimum = (seed, location)
-        return absolute_minimum
-
-    def statistical_in_quotes_best_minimum(self) -> int:
-        counters: dict[int, Counter] = defaultdict(Counter)
-        for granularity, to_consider in itertools.product(
-            (2**p for p in range(11, 17)), (2, 10)
-        ):
-            seed, location = self._instance_compute_approximate_minimum(
-                granularity, to_consider
-            )
-            # print(
-            #     f"{seed=} -> {location=} with {granularity=} & {to_consider=}",
-            #     file=sys.stderr,
-            # )
-            counters[seed][location] += 1
-        return max((c.most_common()[0] for c in counters.values()), key=itemgetter(1))[0]  # type: ignore
+    def interval_minimum(self) -> int:
+        """
+        Lowest location of the seed ranges, exact.
 
+        Whole seed intervals are pushed through the maps, so the work grows with the
+        number of intervals and ranges rather than with the number of seeds: the
+        lowest location is the start of one of the final intervals.
+        """
+        return min(start for start, _ in self.map_intervals(self.gen_intervals()))
 
-def part1(filename: str) -> int:
+
+def parse_file(filename: str) -> MappingPipeline:
     with open(filename) as f:
-        mapping_pipeline = MappingPipeline.parse(f.read())
-        return mapping_pipeline.minimum()
+        return MappingPipeline.parse(f.read()).compile()
+
+
+def solve_part1(mapping_pipeline: MappingPipeline) -> int:
+    return mapping_pipeline.minimum()
+
+
+def part1(filename: str) -> int:
+    return solve_part1(parse_file(filename))
 
 
 # --- Part Two ---
@@ -302,11 +425,13 @@ def part1(filename: str) -> int:
 # What is the lowest location number that corresponds to any of the initial seed numbers?
 
 
+def solve_part2(mapping_pipeline: MappingPipeline) -> int:
+    return mapping_pipeline.interval_minimum()
+
+
 def part2(filename: str) -> int:
-    with open(filename) as f:
-        mapping_pipeline = MappingPipeline.parse(f.read())
-        return mapping_pipeline.statistical_in_quotes_best_minimum()
+    return solve_part2(parse_file(filename))
 
 
-day5 = AOCChallenge(5, part1, part2)
+day5 = AOCChallenge(5, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = [day5]
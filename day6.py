@@ -72,13 +72,15 @@ Determine the number of ways you could beat the record in each race.
 What do you get if you multiply these numbers together?
 """
 
+import math
 import re
-import numpy as np
 
 from utils import extract_numbers, AOCChallenge
 
 
 def compute_num_winning_ways_one_pair(time_limit: int, record_distance: int) -> int:
+    import numpy as np
+
     [x1, x2] = np.sort(
         np.floor(np.roots([1, -(time_limit - 0.01), record_distance + 0.01]))
     )
@@ -92,15 +94,24 @@ def parse_input(race_data: str) -> tuple[tuple[int, int]]:
     return tuple(zip(extract_numbers(time_str), extract_numbers(distance_str)))
 
 
-def part1(filename: str) -> int:
+def parse_file(filename: str) -> str:
+    # the two parts read the race sheet differently, only the file read is shared
     with open(filename) as f:
-        race_info = parse_input(f.read())
-        return np.prod(
-            [
-                compute_num_winning_ways_one_pair(time_limit, record_distance)
-                for time_limit, record_distance in race_info
-            ]
-        )
+        return f.read()
+
+
+def solve_part1(race_data: str) -> int:
+    race_info = parse_input(race_data)
+    return math.prod(
+        [
+            compute_num_winning_ways_one_pair(time_limit, record_distance)
+            for time_limit, record_distance in race_info
+        ]
+    )
+
+
+def part1(filename: str) -> int:
+    return solve_part1(parse_file(filename))
 
 
 # --- Part Two ---
@@ -132,11 +143,14 @@ def parse_input_bad_kerning(race_data: str) -> tuple[int, int]:
     )
 
 
+def solve_part2(race_data: str) -> int:
+    time_limit, record_distance = parse_input_bad_kerning(race_data.strip())
+    return compute_num_winning_ways_one_pair(time_limit, record_distance)
+
+
 def part2(filename: str) -> int:
-    with open(filename) as f:
-        time_limit, record_distance = parse_input_bad_kerning(f.read().strip())
-        return compute_num_winning_ways_one_pair(time_limit, record_distance)
+    return solve_part2(parse_file(filename))
 
 
-day6 = AOCChallenge(6, part1, part2)
+day6 = AOCChallenge(6, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = [day6]
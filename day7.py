@@ -93,27 +93,37 @@ from __future__ import annotations
 
 import sys
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import IntEnum
 from operator import attrgetter
 from itertools import groupby
+from typing import Iterable
 
-from utils import AOCChallenge
+from utils import AOCChallenge, iter_lines
 
-# can be modified depending on which part is being tested
-CARDS: list[str] = "A, K, Q, T, 9, 8, 7, 6, 5, 4, 3, 2, J".split(", ")
-strength: dict[str, int] = {
-    card: len(CARDS) - index for index, card in enumerate(CARDS)
-}
+
+def card_strengths(cards: list[str]) -> dict[str, int]:
+    return {card: len(cards) - index for index, card in enumerate(cards, start=1)}
+
+
+# part 1 ranks J between Q and T, part 2 turns it into the weakest card, a joker
+CARDS: list[str] = "A, K, Q, J, T, 9, 8, 7, 6, 5, 4, 3, 2".split(", ")
+JOKER_CARDS: list[str] = "A, K, Q, T, 9, 8, 7, 6, 5, 4, 3, 2, J".split(", ")
+STRENGTH: dict[str, int] = card_strengths(CARDS)
+JOKER_STRENGTH: dict[str, int] = card_strengths(JOKER_CARDS)
 
 
 @dataclass(frozen=True)
 class Hand:
     cards: tuple[str, str, str, str, str]  # a hand has five cards
+    # card order used to break ties, carried by the hand so the parts share no global state
+    strength: dict[str, int] = field(
+        default_factory=lambda: STRENGTH, compare=False, hash=False, repr=False
+    )
 
     def __post_init__(self):
         def is_valid_card(card: str):
-            if card not in CARDS:
+            if card not in self.strength:
                 raise ValueError(f"{card} is not a valid card")
 
         return len(self) == 5 and all(map(is_valid_card, self))
@@ -131,7 +141,10 @@ class Hand:
         assert "J" in self.cards
         cards = list(self.cards)
         cards[cards.index("J")] = card
-        return Hand(tuple(cards))  # type:ignore
+        return Hand(tuple(cards), self.strength)  # type:ignore
+
+    def with_strength(self, strength: dict[str, int]) -> Hand:
+        return Hand(self.cards, strength)
 
     def remove_all_jokers(self) -> tuple[str, ...]:
         return tuple(card for card in self if card != "J")
@@ -143,10 +156,10 @@ class Hand:
     def __lt__(self, other: Hand):
         assert isinstance(other, Hand)
         for this_card, other_card in zip(self, other):
-            if strength[this_card] == strength[other_card]:
+            if self.strength[this_card] == self.strength[other_card]:
                 continue
             else:
-                return strength[this_card] < strength[other_card]
+                return self.strength[this_card] < self.strength[other_card]
         print("equal hands found", file=sys.stderr)
         return False
 
@@ -242,33 +255,46 @@ def sort_by_relative_strength(
     return result
 
 
-def parse_camel_cards_bids(data: str) -> tuple[tuple[Hand, int]]:
+def parse_camel_cards_bids_from_lines(
+    lines: Iterable[str],
+) -> tuple[tuple[Hand, int]]:
     return tuple(
         (
             Hand.from_str(hand_str.strip()),
             int(bid_str.strip()),
         )
-        for hand_str, bid_str in (line.split(" ") for line in data.splitlines())
+        for hand_str, bid_str in (line.split(" ") for line in lines)
     )
 
 
-def compute_total_winnings(filename: str, kind_compute_function):
+def parse_camel_cards_bids(data: str) -> tuple[tuple[Hand, int]]:
+    return parse_camel_cards_bids_from_lines(data.splitlines())
+
+
+def parse_file(filename: str) -> tuple[tuple[Hand, int]]:
     with open(filename) as f:
-        hands = parse_camel_cards_bids(f.read())
-        bids = sort_by_hand_kind(hands, kind_compute_function)
-        weighted_bids = sort_by_relative_strength(bids)
-        sum_prod = sum(
-            camel_card.bid * relative_strength
-            for camel_card, relative_strength in weighted_bids
-        )
-        return sum_prod
+        return parse_camel_cards_bids(f.read())
+
+
+def total_winnings(hands: tuple[tuple[Hand, int]], kind_compute_function) -> int:
+    bids = sort_by_hand_kind(hands, kind_compute_function)
+    weighted_bids = sort_by_relative_strength(bids)
+    sum_prod = sum(
+        camel_card.bid * relative_strength
+        for camel_card, relative_strength in weighted_bids
+    )
+    return sum_prod
+
+
+def solve_part1(hands: tuple[tuple[Hand, int]]) -> int:
+    return total_winnings(
+        tuple((hand.with_strength(STRENGTH), bid) for hand, bid in hands),
+        compute_hand_kind,
+    )
 
 
 def part1(filename: str) -> int:
-    global CARDS, strength
-    CARDS = "A, K, Q, J, T, 9, 8, 7, 6, 5, 4, 3, 2".split(", ")
-    strength = {card: len(CARDS) - index for index, card in enumerate(CARDS, start=1)}
-    return compute_total_winnings(filename, compute_hand_kind)
+    return solve_part1(parse_file(filename))
 
 
 # --- Part Two ---
@@ -309,7 +335,7 @@ def get_strongest_most_common_card(hand: Hand) -> str:
             break
         results.append(card)
 
-    results.sort(key=lambda c: strength[c], reverse=True)
+    results.sort(key=lambda c: hand.strength[c], reverse=True)
     return results[0]
 
 
@@ -322,12 +348,31 @@ def compute_hand_kind_with_joker(hand: Hand) -> HandKind:
     return compute_hand_kind_with_joker(hand)
 
 
+def solve_part2(hands: tuple[tuple[Hand, int]]) -> int:
+    return total_winnings(
+        tuple((hand.with_strength(JOKER_STRENGTH), bid) for hand, bid in hands),
+        compute_hand_kind_with_joker,
+    )
+
+
 def part2(filename: str) -> int:
-    global CARDS, strength
-    CARDS = "A, K, Q, T, 9, 8, 7, 6, 5, 4, 3, 2, J".split(", ")
-    strength = {card: len(CARDS) - index for index, card in enumerate(CARDS, start=1)}
-    return compute_total_winnings(filename, compute_hand_kind_with_joker)
+    return solve_part2(parse_file(filename))
+
+
+def stream_hands(filename: str) -> tuple[tuple[Hand, int]]:
+    # ranking needs every hand, but the hands are parsed without holding the text
+    return parse_camel_cards_bids_from_lines(
+        line for line in iter_lines(filename) if line
+    )
+
+
+def stream_part1(filename: str) -> int:
+    return solve_part1(stream_hands(filename))
+
+
+def stream_part2(filename: str) -> int:
+    return solve_part2(stream_hands(filename))
 
 
-day7 = AOCChallenge(7, part1, part2)
+day7 = AOCChallenge(7, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = day7
@@ -77,10 +77,18 @@ def solve(directions, graph, start, termination=lambda current, dst: current ==
         num_steps += 1
 
 
-def part1(filename: str):
+def parse_file(filename: str):
     with open(filename) as f:
-        directions, graph = parse_input(f.read())
-        return solve(directions, graph, "AAA")
+        return parse_input(f.read())
+
+
+def solve_part1(network) -> int:
+    directions, graph = network
+    return solve(directions, graph, "AAA")
+
+
+def part1(filename: str):
+    return solve_part1(parse_file(filename))
 
 
 # --- Part Two ---
@@ -127,18 +135,19 @@ def part1(filename: str):
 # that end with Z?
 
 
-def part2(filename: str):
-    with open(filename) as f:
-        directions, graph = parse_input(f.read())
-        return math.lcm(
-            *(
-                solve(
-                    directions, graph, start, lambda current, dst: current.endswith("Z")
-                )
-                for start in filter(lambda node: node.endswith("A"), graph.keys())
-            )
+def solve_part2(network) -> int:
+    directions, graph = network
+    return math.lcm(
+        *(
+            solve(directions, graph, start, lambda current, dst: current.endswith("Z"))
+            for start in filter(lambda node: node.endswith("A"), graph.keys())
         )
+    )
+
+
+def part2(filename: str):
+    return solve_part2(parse_file(filename))
 
 
-day8 = AOCChallenge(8, part1, part2)
+day8 = AOCChallenge(8, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = [day8]
@@ -89,9 +89,14 @@ Analyze your OASIS report and extrapolate the next value for each history.
 
 What is the sum of these extrapolated values?
 """
+from __future__ import annotations
 
-from utils import AOCChallenge, extract_numbers
-from typing import Sequence
+from typing import TYPE_CHECKING, Iterator, Sequence
+
+from utils import AOCChallenge, extract_numbers, extract_numbers_bulk, iter_lines
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def extrapolate_value(
@@ -110,13 +115,56 @@ def extrapolate_value(
         return number_sequence[0 if extrapolate_backward else -1] + extrapolated_value
 
 
+def extrapolate_rows(histories: np.ndarray, extrapolate_backward: bool = False):
+    """extrapolate_value over every row of a 2D array of equally long histories."""
+    import numpy as np
+
+    # the recursion adds up the last (first, with alternating signs, going backward)
+    # value of every row of the difference table
+    extrapolated = np.zeros(len(histories), dtype=histories.dtype)
+    sign = 1
+    while histories.shape[1]:
+        if extrapolate_backward:
+            extrapolated += sign * histories[:, 0]
+            sign = -sign
+        else:
+            extrapolated += histories[:, -1]
+        histories = np.diff(histories, axis=1)
+    return extrapolated
+
+
+def parse_file(filename: str) -> tuple[np.ndarray, np.ndarray]:
+    with open(filename, "rb") as f:
+        return extract_numbers_bulk(f.read().strip())
+
+
+def sum_extrapolated(
+    histories: tuple[np.ndarray, np.ndarray], extrapolate_backward: bool = False
+) -> int:
+    import numpy as np
+
+    numbers, offsets = histories
+    lengths = np.diff(offsets)
+    total = 0
+    # histories of the same length are extrapolated together
+    for length in np.unique(lengths[lengths > 0]):
+        starts = offsets[:-1][lengths == length]
+        rows = numbers[starts[:, np.newaxis] + np.arange(length)]
+        # every difference at most doubles the largest value, the rows whose sums
+        # could leave int64 are extrapolated with Python ints
+        largest = int(np.abs(rows).max()) if rows.size else 0
+        if largest * len(rows) << int(length) >= 2**63:
+            rows = rows.astype(object)
+        total += int(extrapolate_rows(rows, extrapolate_backward).sum())
+    return total
+
+
 def sum_extrapolated_values(filename: str, extrapolate_backward: bool = False) -> int:
-    with open(filename) as f:
-        file_content = f.read().strip()
-        number_sequences = list(map(extract_numbers, file_content.splitlines()))
-        return sum(
-            map(lambda x: extrapolate_value(x, extrapolate_backward), number_sequences)
-        )
+    return sum_extrapolated(parse_file(filename), extrapolate_backward)
+
+
+def solve_part1(histories: tuple[np.ndarray, np.ndarray]) -> int:
+    return sum_extrapolated(histories)
 
 
 def part1(filename: str) -> int:
@@ -150,9 +198,28 @@ def part1(filename: str) -> int:
 # What is the sum of these extrapolated values?
 
 
+def solve_part2(histories: tuple[np.ndarray, np.ndarray]) -> int:
+    return sum_extrapolated(histories, extrapolate_backward=True)
+
+
 def part2(filename: str) -> int:
     return sum_extrapolated_values(filename, extrapolate_backward=True)
 
 
-day9 = AOCChallenge(9, part1, part2)
+def stream_sequences(filename: str) -> Iterator[tuple[int]]:
+    return (extract_numbers(line) for line in iter_lines(filename) if line.strip())
+
+
+def stream_part1(filename: str) -> int:
+    return sum(map(extrapolate_value, stream_sequences(filename)))
+
+
+def stream_part2(filename: str) -> int:
+    return sum(
+        extrapolate_value(number_sequence, extrapolate_backward=True)
+        for number_sequence in stream_sequences(filename)
+    )
+
+
+day9 = AOCChallenge(9, part1, part2, parse_file, solve_part1, solve_part2)
 __all__ = [day9]
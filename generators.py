@@ -0,0 +1,381 @@
+"""
+Synthetic puzzle inputs of any size, for measuring how the solutions scale.
+
+    python -m generators 4 100000 -o /tmp/day4_big.txt   # 100k scratchcards
+    python -m generators 11 10000 --seed 7               # a 10k x 10k universe on stdout
+
+The meaning of `size` depends on the day (lines, cards, hands, grid side, ...),
+see GENERATORS. The same (day, size, seed) always produces the same input.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import sys
+from itertools import accumulate, product
+from typing import Callable, Sequence
+
+from day1 import STRING_NUMBERS
+
+DIGITS = "123456789"
+SYMBOLS = "*#+$/@=%&-"
+COLORS = ("red", "green", "blue")
+CAMEL_CARDS = "AKQJT98765432"
+ALMANAC_CATEGORIES = (
+    "seed",
+    "soil",
+    "fertilizer",
+    "water",
+    "light",
+    "temperature",
+    "humidity",
+    "location",
+)
+ALMANAC_UNIVERSE = 2**32
+NODE_ALPHABET = string.ascii_uppercase + string.digits
+
+
+def generate_day1(num_lines: int, rng: random.Random) -> str:
+    """`num_lines` calibration lines, each with at least one digit."""
+    words = list(STRING_NUMBERS)
+    lines = []
+    for _ in range(num_lines):
+        chunks, length = [], rng.randint(5, 50)
+        while length > 0:
+            kind = rng.random()
+            if kind < 0.15:
+                chunks.append(rng.choice(DIGITS))
+            elif kind < 0.3:
+                chunks.append(rng.choice(words))
+            else:
+                chunks.append(rng.choice(string.ascii_lowercase))
+            length -= len(chunks[-1])
+        chunks.insert(rng.randrange(len(chunks) + 1), rng.choice(DIGITS))
+        lines.append("".join(chunks))
+    return "\n".join(lines) + "\n"
+
+
+def generate_day2(num_games: int, rng: random.Random) -> str:
+    """`num_games` games of one to six rounds."""
+    lines = []
+    for game_id in range(1, num_games + 1):
+        rounds = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(COLORS, rng.randint(1, 3))
+            rounds.append(
+                ", ".join(
+                    f"{rng.randint(1, 12 if rng.random() < 0.9 else 20)} {color}"
+                    for color in colors
+                )
+            )
+        lines.append(f"Game {game_id}: " + "; ".join(rounds))
+    return "\n".join(lines) + "\n"
+
+
+def generate_day3(side: int, rng: random.Random) -> str:
+    """A `side` x `side` engine schematic."""
+    rows = []
+    for _ in range(side):
+        row = []
+        while len(row) < side:
+            kind = rng.random()
+            if kind < 0.12 and (not row or not row[-1].isdigit()):
+                row.extend(str(rng.randint(1, 999)))
+            elif kind < 0.18:
+                row.append("*" if rng.random() < 0.4 else rng.choice(SYMBOLS))
+            else:
+                row.append(".")
+        # a number cut by the right edge is still a number
+        rows.append("".join(row[:side]))
+    return "\n".join(rows) + "\n"
+
+
+def generate_day4(num_cards: int, rng: random.Random) -> str:
+    """
+    `num_cards` scratchcards with 10 winning and 25 held numbers out of 1..99.
+
+    Cards match 0.76 numbers on average, so the number of copies in part 2 stays
+    roughly linear in `num_cards` (a mean above one makes it grow exponentially).
+    """
+    lines, width = [], len(str(num_cards))
+    for card_id in range(1, num_cards + 1):
+        winning = rng.sample(range(1, 100), 10)
+        num_matches = min(
+            rng.choices(range(11), weights=(80, 6, 3, 2, 2, 2, 1, 1, 1, 1, 1))[0],
+            num_cards - card_id,
+        )
+        losing = rng.sample(sorted(set(range(1, 100)) - set(winning)), 25 - num_matches)
+        held = rng.sample(winning, num_matches) + losing
+        rng.shuffle(held)
+        lines.append(
+            f"Card {card_id:>{width}}: "
+            + " ".join(f"{n:>2}" for n in winning)
+            + " | "
+            + " ".join(f"{n:>2}" for n in held)
+        )
+    return "\n".join(lines) + "\n"
+
+
+def generate_day5(num_ranges: int, rng: random.Random) -> str:
+    """An almanac with `num_ranges` ranges per map and 10 seed ranges."""
+    seed_pairs = []
+    for _ in range(10):
+        extent = rng.randint(1, ALMANAC_UNIVERSE // 40)
+        seed_pairs.extend((rng.randrange(ALMANAC_UNIVERSE - extent), extent))
+
+    sections = ["seeds: " + " ".join(map(str, seed_pairs))]
+    for src_name, dest_name in zip(ALMANAC_CATEGORIES, ALMANAC_CATEGORIES[1:]):
+        # disjoint source ranges with gaps between them, laid out contiguously
+        # (in a random order) on the destination side
+        cuts = sorted(rng.sample(range(ALMANAC_UNIVERSE), 2 * num_ranges))
+        sources = list(zip(cuts[::2], cuts[1::2]))
+        rng.shuffle(sources)
+        total = sum(stop - start for start, stop in sources)
+        destination = rng.randint(0, ALMANAC_UNIVERSE - total)
+        lines = [f"{src_name}-to-{dest_name} map:"]
+        for start, stop in sources:
+            lines.append(f"{destination} {start} {stop - start}")
+            destination += stop - start
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections) + "\n"
+
+
+def generate_day6(num_races: int, rng: random.Random) -> str:
+    """`num_races` races. Part 2 joins all the numbers, so keep this small for it."""
+    races = []
+    for _ in range(num_races):
+        time_limit = rng.randint(7, 100)
+        best = (time_limit // 2) * (time_limit - time_limit // 2)
+        races.append((time_limit, rng.randrange(best)))
+    width = max(len(str(value)) for race in races for value in race)
+    times = " ".join(f"{time_limit:>{width}}" for time_limit, _ in races)
+    distances = " ".join(f"{distance:>{width}}" for _, distance in races)
+    return f"Time:     {times}\nDistance: {distances}\n"
+
+
+def generate_day7(num_hands: int, rng: random.Random) -> str:
+    """`num_hands` camel card hands, all distinct as long as there are enough hands."""
+    num_distinct = len(CAMEL_CARDS) ** 5
+    if num_hands <= num_distinct:
+        codes = rng.sample(range(num_distinct), num_hands)
+    else:
+        codes = [rng.randrange(num_distinct) for _ in range(num_hands)]
+    lines = []
+    for code in codes:
+        cards = []
+        for _ in range(5):
+            code, index = divmod(code, len(CAMEL_CARDS))
+            cards.append(CAMEL_CARDS[index])
+        lines.append(f"{''.join(cards)} {rng.randint(1, 1000)}")
+    return "\n".join(lines) + "\n"
+
+
+def _primes_up_to(n: int) -> list[int]:
+    sieve = [True] * (n + 1)
+    for i in range(2, int(n**0.5) + 1):
+        if sieve[i]:
+            sieve[i * i :: i] = [False] * len(sieve[i * i :: i])
+    return [i for i in range(2, n + 1) if sieve[i]]
+
+
+def generate_day8(num_nodes: int, rng: random.Random) -> str:
+    """
+    A network of `num_nodes` nodes.
+
+    Like the real puzzle, every ghost walks a cycle from its ..A start back to its
+    ..Z end whose length is a multiple of the number of instructions, AAA being the
+    ghost that ends in ZZZ, so the LCM in part 2 holds.
+    """
+    middle_alphabet = NODE_ALPHABET.replace("A", "").replace("Z", "")
+    capacity = len(NODE_ALPHABET) ** 2 * len(middle_alphabet)
+    if not 3 <= num_nodes <= capacity:
+        raise ValueError(f"day 8 supports between 3 and {capacity} nodes")
+
+    num_ghosts = max(1, min(6, num_nodes // 100))
+    budget = num_nodes // num_ghosts - 1
+    num_instructions = rng.randint(max(1, budget // 100), max(1, budget // 20))
+    primes = _primes_up_to(budget // num_instructions) or [1]
+    cycle_multiples = (
+        rng.sample(primes[-4 * num_ghosts :], num_ghosts)
+        if len(primes[-4 * num_ghosts :]) >= num_ghosts
+        else [rng.choice(primes) for _ in range(num_ghosts)]
+    )
+    instructions = "".join(rng.choice("LR") for _ in range(num_instructions))
+
+    prefixes = ["".join(p) for p in product(NODE_ALPHABET, repeat=2)]
+    prefixes.remove("AA")
+    prefixes.remove("ZZ")
+    starts = ["AAA"] + [p + "A" for p in rng.sample(prefixes, num_ghosts - 1)]
+    ends = ["ZZZ"] + [p + "Z" for p in rng.sample(prefixes, num_ghosts - 1)]
+    cycle_lengths = [m * num_instructions for m in cycle_multiples]
+    num_middle = num_nodes - 2 * num_ghosts
+    names = (
+        "".join(name)
+        for name in rng.sample(
+            sorted(product(NODE_ALPHABET, NODE_ALPHABET, middle_alphabet)),
+            num_middle,
+        )
+    )
+    # cycle nodes take what they need, whatever is left over becomes filler
+    chains = [
+        [start, *(next(names) for _ in range(length - 1)), end]
+        for start, end, length in zip(starts, ends, cycle_lengths)
+    ]
+    fillers = list(names)
+    every_node = [node for chain in chains for node in chain] + fillers
+
+    edges = {}
+    for chain in chains:
+        # the ..Z node leaves exactly like the ..A node, which closes the cycle
+        for step, (node, successor) in enumerate(zip(chain, chain[1:] + [chain[1]])):
+            decoy = rng.choice(every_node)
+            if instructions[step % num_instructions] == "L":
+                edges[node] = (successor, decoy)
+            else:
+                edges[node] = (decoy, successor)
+    for node in fillers:
+        edges[node] = (rng.choice(every_node), rng.choice(every_node))
+
+    lines = [f"{node} = ({left}, {right})" for node, (left, right) in edges.items()]
+    rng.shuffle(lines)
+    return f"{instructions}\n\n" + "\n".join(lines) + "\n"
+
+
+def generate_day9(num_histories: int, rng: random.Random) -> str:
+    """`num_histories` histories of 21 values generated by polynomials of degree <= 6."""
+    lines = []
+    for _ in range(num_histories):
+        degree = rng.randint(0, 6)
+        # build the difference table bottom up, starting from a constant row
+        sequence = [rng.randint(-9, 9)] * (21 - degree)
+        for _ in range(degree):
+            sequence = list(accumulate(sequence, initial=rng.randint(-20, 20)))
+        lines.append(" ".join(map(str, sequence)))
+    return "\n".join(lines) + "\n"
+
+
+_PIPES = {
+    frozenset("NS"): "|",
+    frozenset("EW"): "-",
+    frozenset("NE"): "L",
+    frozenset("NW"): "J",
+    frozenset("SW"): "7",
+    frozenset("SE"): "F",
+}
+
+
+def _heading(frm: tuple[int, int], to: tuple[int, int]) -> str:
+    return {(-1, 0): "N", (1, 0): "S", (0, -1): "W", (0, 1): "E"}[
+        (to[0] - frm[0], to[1] - frm[1])
+    ]
+
+
+def generate_day10(side: int, rng: random.Random) -> str:
+    """
+    A `side` x `side` field of pipes holding one big loop.
+
+    The loop is a comb: a straight top edge and a bottom edge with teeth of random
+    depth, with junk pipes everywhere else.
+    """
+    if side < 6:
+        raise ValueError("day 10 needs a side of at least 6")
+    margin = rng.randint(0, side // 10)
+    height = width = side - 2 * margin
+
+    loop = [(0, col) for col in range(width)]
+    loop += [(row, width - 1) for row in range(1, height)]
+    col = width - 2
+    loop.append((height - 1, col))
+    while col > 1:
+        if rng.random() < 0.7:
+            depth = rng.randint(1, height - 2)
+            loop += [(row, col) for row in range(height - 2, depth - 1, -1)]
+            loop += [(row, col - 1) for row in range(depth, height)]
+            col -= 2
+        else:
+            col -= 1
+        loop.append((height - 1, col))
+    if col == 1:
+        col = 0
+        loop.append((height - 1, col))
+    loop += [(row, 0) for row in range(height - 2, 0, -1)]
+
+    grid = [[rng.choice("|-LJ7F.......") for _ in range(side)] for _ in range(side)]
+    for index, cell in enumerate(loop):
+        before, after = loop[index - 1], loop[(index + 1) % len(loop)]
+        pipe = _PIPES[frozenset((_heading(cell, before), _heading(cell, after)))]
+        grid[cell[0] + margin][cell[1] + margin] = pipe
+    # the start sits on the top left corner, clear whatever could connect to it
+    grid[margin][margin] = "S"
+    if margin:
+        grid[margin - 1][margin] = grid[margin][margin - 1] = "."
+    return "\n".join(map("".join, grid)) + "\n"
+
+
+def generate_day11(side: int, rng: random.Random) -> str:
+    """A `side` x `side` universe where about 2% of the cells are galaxies."""
+    empty_rows = set(rng.sample(range(side), side // 20))
+    empty_cols = set(rng.sample(range(side), side // 20))
+    occupied_cols = [col for col in range(side) if col not in empty_cols]
+    rows = []
+    for row_index in range(side):
+        row = bytearray(b"." * side)
+        if row_index not in empty_rows:
+            num_galaxies = min(
+                len(occupied_cols), round(rng.gauss(0.02 * side, 0.005 * side))
+            )
+            for col in rng.sample(occupied_cols, max(0, num_galaxies)):
+                row[col] = ord("#")
+        rows.append(row.decode())
+    return "\n".join(rows) + "\n"
+
+
+GENERATORS: dict[int, Callable[[int, random.Random], str]] = {
+    1: generate_day1,
+    2: generate_day2,
+    3: generate_day3,
+    4: generate_day4,
+    5: generate_day5,
+    6: generate_day6,
+    7: generate_day7,
+    8: generate_day8,
+    9: generate_day9,
+    10: generate_day10,
+    11: generate_day11,
+}
+
+
+def generate(day: int, size: int, seed: int = 0) -> str:
+    if day not in GENERATORS:
+        raise ValueError(f"no generator for day {day}")
+    if size < 1:
+        raise ValueError(f"size must be positive, got {size}")
+    return GENERATORS[day](size, random.Random(f"{day}:{size}:{seed}"))
+
+
+def write_input(day: int, size: int, filename: str, seed: int = 0) -> str:
+    with open(filename, "w") as f:
+        f.write(generate(day, size, seed))
+    return filename
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m generators", description="Generate synthetic puzzle inputs"
+    )
+    parser.add_argument("day", type=int, choices=sorted(GENERATORS))
+    parser.add_argument("size", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+    if args.output:
+        write_input(args.day, args.size, args.output, args.seed)
+    else:
+        sys.stdout.write(generate(args.day, args.size, args.seed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Profiling hooks for the solutions.
+
+    python -m runner -d 5 --profile profiles/              # cProfile + memory of every phase
+    python -m runner -d 7 --profile profiles/ --count day7.Hand.__lt__ day7.Hand.__eq__
+
+Each phase (parse, part1, part2) runs under cProfile and tracemalloc, and the hot
+functions named by their dotted path are wrapped with call counters for the duration
+of the phase. The solution code is not edited: counters are patched onto the module or
+class and restored afterwards. Every phase is dumped as a pstats file and all phases
+are summarised in one JSON file.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import importlib
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+# functions worth counting by default, per day
+HOT_FUNCTIONS: dict[int, tuple[str, ...]] = {
+    5: ("day5.CompiledMapping.map",),
+    7: ("day7.Hand.__lt__",),
+    10: ("day10.Grid.can_move",),
+}
+
+_MISSING = object()
+
+
+def resolve(dotted_name: str) -> tuple[Any, str]:
+    """Owner (module or class) and attribute name of a dotted path like day5.Mapping.map."""
+    names = dotted_name.split(".")
+    for split in range(len(names) - 1, 0, -1):
+        try:
+            owner = importlib.import_module(".".join(names[:split]))
+        except ImportError:
+            continue
+        for name in names[split:-1]:
+            owner = getattr(owner, name)
+        if not hasattr(owner, names[-1]):
+            raise AttributeError(f"{dotted_name} does not exist")
+        return owner, names[-1]
+    raise ImportError(f"no module found for {dotted_name}")
+
+
+@contextmanager
+def count_calls(dotted_names: Sequence[str]) -> Iterator[Counter[str]]:
+    """Counts the calls of every named function while the context is active."""
+    calls: Counter[str] = Counter({name: 0 for name in dotted_names})
+    patched = []
+    try:
+        for dotted_name in dotted_names:
+            owner, name = resolve(dotted_name)
+            # the raw attribute, so inherited methods are deleted again rather than copied
+            original = vars(owner).get(name, _MISSING)
+            function = getattr(owner, name)
+
+            @functools.wraps(function)
+            def counted(*args, _function=function, _name=dotted_name, **kwargs):
+                calls[_name] += 1
+                return _function(*args, **kwargs)
+
+            setattr(owner, name, counted)
+            patched.append((owner, name, original))
+        yield calls
+    finally:
+        for owner, name, original in reversed(patched):
+            if original is _MISSING:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+
+
+@dataclass
+class PhaseReport:
+    day: int
+    phase: str
+    filename: str
+    wall_time: float
+    peak_memory: int | None
+    calls: dict[str, int]
+    # the most expensive functions by cumulative time
+    top_functions: list[dict[str, Any]]
+    stats_file: str | None
+
+
+def top_functions(profiler: cProfile.Profile, limit: int) -> list[dict[str, Any]]:
+    stats = pstats.Stats(profiler).stats  # type: ignore[attr-defined]
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": num_calls,
+            "total_time": total_time,
+            "cumulative_time": cumulative_time,
+        }
+        for (filename, line, name), (
+            _,
+            num_calls,
+            total_time,
+            cumulative_time,
+            _,
+        ) in rows
+    ]
+
+
+@dataclass
+class Instrumentation:
+    profile: bool = True
+    trace_memory: bool = True
+    counters: Sequence[str] = ()
+    # where the pstats files go, None to keep the profiles in memory only
+    output_dir: str | None = None
+    top: int = 10
+    reports: list[PhaseReport] = field(default_factory=list)
+
+    def run(
+        self, day: int, phase: str, filename: str, func: Callable[..., Any], *args: Any
+    ) -> Any:
+        profiler = cProfile.Profile() if self.profile else None
+        with count_calls(self.counters) as calls:
+            if self.trace_memory:
+                tracemalloc.start()
+            if profiler is not None:
+                profiler.enable()
+            wall_start = time.perf_counter()
+            try:
+                answer = func(*args)
+            finally:
+                wall_time = time.perf_counter() - wall_start
+                if profiler is not None:
+                    profiler.disable()
+                peak_memory = None
+                if self.trace_memory:
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+
+        stats_file = None
+        if profiler is not None and self.output_dir is not None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stats_file = os.path.join(
+                self.output_dir, f"day{day}_{Path(filename).stem}_{phase}.prof"
+            )
+            profiler.dump_stats(stats_file)
+        self.reports.append(
+            PhaseReport(
+                day,
+                phase,
+                filename,
+                wall_time,
+                peak_memory,
+                dict(calls),
+                top_functions(profiler, self.top) if profiler is not None else [],
+                stats_file,
+            )
+        )
+        return answer
+
+    def write_summary(self, filename: str) -> None:
+        with open(filename, "w") as f:
+            json.dump([asdict(report) for report in self.reports], f, indent=2)
+
+    def format_report(self) -> str:
+        lines = []
+        for report in self.reports:
+            memory = (
+                "" if report.peak_memory is None else f", peak {report.peak_memory} B"
+            )
+            lines.append(
+                f"day {report.day} {report.phase} on {report.filename}: "
+                f"{report.wall_time:.4f}s{memory}"
+            )
+            lines.extend(
+                f"    {count:>12}  {name}" for name, count in report.calls.items()
+            )
+            lines.extend(
+                f"    {row['cumulative_time']:>11.4f}s  {row['function']}"
+                for row in report.top_functions[:3]
+            )
+        return "\n".join(lines)
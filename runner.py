@@ -0,0 +1,370 @@
+"""
+Timed runner for the Advent of Code solutions.
+
+    python -m runner                              # every day, both parts, input/dayN.txt
+    python -m runner -d 5 10 -p 2                 # only part 2 of days 5 and 10
+    python -m runner -i "input/day{day}_tiny.txt" # a different input per day
+    python -m runner --json results.json          # also dump the measurements as JSON
+    python -m runner -j 0                         # one process per (day, part, input), every core
+    python -m runner --cache                      # reuse answers of unchanged inputs and code
+    python -m runner -d 5 --profile profiles/     # cProfile, memory and call counts per phase
+
+Every part is reported with its wall time, CPU time and peak traced memory.
+Days that define a parse stage are parsed once per input, the parse is reported
+as its own phase and both parts are then timed on the parsed input. With --jobs every
+(day, part, input) runs in a process pool, so each job parses its own input.
+With --profile the phases run under instrumentation.Instrumentation instead of the
+timer, see instrumentation.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Sequence
+
+from cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache
+from utils import AOCChallenge, available_days, load_challenge
+
+DEFAULT_INPUT_TEMPLATE = "input/day{day}.txt"
+
+
+def discover_challenges() -> dict[int, AOCChallenge]:
+    """Every challenge, this imports every day, prefer load_challenge for a few days."""
+    return {day: load_challenge(day) for day in available_days()}
+
+
+@dataclass
+class Measurement:
+    day: int
+    phase: str
+    filename: str
+    answer: Any
+    wall_time: float
+    cpu_time: float
+    peak_memory: int | None
+    cached: bool = False
+
+
+def measure(
+    day: int,
+    phase: str,
+    filename: str,
+    func: Callable[..., Any],
+    *args: Any,
+    trace_memory: bool = True,
+) -> Measurement:
+    if trace_memory:
+        tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        answer = func(*args)
+    finally:
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.process_time() - cpu_start
+        peak_memory = None
+        if trace_memory:
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return Measurement(day, phase, filename, answer, wall_time, cpu_time, peak_memory)
+
+
+def time_parts(
+    challenge: AOCChallenge,
+    filename: str,
+    parts: Iterable[int] = (1, 2),
+    trace_memory: bool = True,
+) -> list[Measurement]:
+    if challenge.parse is None:
+        return [
+            measure(
+                challenge.day,
+                f"part{part}",
+                filename,
+                getattr(challenge, f"part{part}"),
+                filename,
+                trace_memory=trace_memory,
+            )
+            for part in parts
+        ]
+
+    # parse once, then time every part on the shared parsed input
+    parse_measurement = measure(
+        challenge.day,
+        "parse",
+        filename,
+        challenge.parse,
+        filename,
+        trace_memory=trace_memory,
+    )
+    parsed, parse_measurement.answer = parse_measurement.answer, None
+    return [parse_measurement] + [
+        measure(
+            challenge.day,
+            f"part{part}",
+            filename,
+            getattr(challenge, f"solve_part{part}"),
+            parsed,
+            trace_memory=trace_memory,
+        )
+        for part in parts
+    ]
+
+
+def run_challenge(
+    challenge: AOCChallenge,
+    filename: str,
+    parts: Iterable[int] = (1, 2),
+    trace_memory: bool = True,
+    cache: ResultCache | None = None,
+) -> list[Measurement]:
+    if cache is None:
+        return time_parts(challenge, filename, parts, trace_memory)
+
+    # the input and the sources are hashed once, not once per lookup
+    input_key = cache.input_key(challenge.day, filename)
+    hits, misses = [], []
+    for part in parts:
+        measurement = measure(
+            challenge.day,
+            f"part{part}",
+            filename,
+            cache.get,
+            challenge.day,
+            part,
+            filename,
+            input_key,
+            trace_memory=trace_memory,
+        )
+        if measurement.answer is None:
+            misses.append(part)
+        else:
+            measurement.cached = True
+            hits.append(measurement)
+    # only parse when some part is not cached
+    solved = time_parts(challenge, filename, misses, trace_memory) if misses else []
+    for measurement in solved:
+        if measurement.phase.startswith("part"):
+            cache.put(
+                challenge.day,
+                int(measurement.phase.removeprefix("part")),
+                filename,
+                measurement.answer,
+                input_key,
+            )
+    return sorted(hits + solved, key=lambda m: m.phase)
+
+
+def run_job(
+    day: int,
+    part: int,
+    filename: str,
+    trace_memory: bool = True,
+    cache: ResultCache | None = None,
+) -> list[Measurement]:
+    measurements = run_challenge(
+        load_challenge(day), filename, (part,), trace_memory, cache
+    )
+    # every job parses on its own, say which part a parse belongs to
+    for measurement in measurements:
+        if measurement.phase == "parse":
+            measurement.phase = f"parse (part{part})"
+    return measurements
+
+
+def run_parallel(
+    jobs: Iterable[tuple[int, int, str]],
+    max_workers: int | None = None,
+    trace_memory: bool = True,
+    cache: ResultCache | None = None,
+) -> list[Measurement]:
+    # concurrent.futures is only imported when a pool is used, a single day starts faster
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    measurements = []
+    with ProcessPoolExecutor(max_workers) as pool:
+        futures = {
+            pool.submit(run_job, day, part, filename, trace_memory, cache): (
+                day,
+                part,
+                filename,
+            )
+            for day, part, filename in jobs
+        }
+        for future in as_completed(futures):
+            day, part, filename = futures[future]
+            measurements.extend(future.result())
+            print(f"finished day {day} part {part} on {filename}", file=sys.stderr)
+    return sorted(measurements, key=lambda m: (m.day, m.filename, m.phase))
+
+
+def format_memory(num_bytes: int | None) -> str:
+    if num_bytes is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GiB"
+
+
+def format_table(measurements: Sequence[Measurement]) -> str:
+    header = ("day", "phase", "input", "answer", "wall (s)", "cpu (s)", "peak mem")
+    rows = [
+        (
+            str(m.day),
+            f"{m.phase} (cached)" if m.cached else m.phase,
+            m.filename,
+            "-" if m.answer is None else str(m.answer),
+            f"{m.wall_time:.4f}",
+            f"{m.cpu_time:.4f}",
+            format_memory(m.peak_memory),
+        )
+        for m in measurements
+    ]
+    widths = [max(map(len, column)) for column in zip(header, *rows)]
+    return "\n".join(
+        "  ".join(cell.rjust(width) for cell, width in zip(row, widths))
+        for row in (header, *rows)
+    )
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m runner", description="Run and time Advent of Code solutions"
+    )
+    parser.add_argument(
+        "-d", "--days", type=int, nargs="+", help="days to run (default: all)"
+    )
+    parser.add_argument(
+        "-p", "--parts", type=int, nargs="+", choices=(1, 2), default=[1, 2]
+    )
+    parser.add_argument(
+        "-i",
+        "--inputs",
+        nargs="+",
+        default=[DEFAULT_INPUT_TEMPLATE],
+        help="input files, '{day}' is replaced by the day number",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="do not trace memory, tracing slows down the solutions",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes, 0 for one per core (default: 1, no pool)",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE_DIR,
+        help=f"reuse answers cached in this directory (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help="evict the least recently used answers beyond this many bytes",
+    )
+    parser.add_argument("--json", help="write the measurements to this file")
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="profile every phase, write the pstats files and summary.json to DIR",
+    )
+    parser.add_argument(
+        "--count",
+        nargs="+",
+        default=[],
+        metavar="FUNCTION",
+        help="with --profile, also count calls of these dotted names "
+        "(default: the hot functions of the selected days)",
+    )
+    return parser.parse_args(argv)
+
+
+def profile(
+    challenges: dict[int, AOCChallenge],
+    inputs: Sequence[tuple[int, str]],
+    args: argparse.Namespace,
+) -> int:
+    from instrumentation import HOT_FUNCTIONS, Instrumentation
+
+    if args.jobs != 1:
+        print("--profile patches the running process, use --jobs 1", file=sys.stderr)
+        return 1
+    reports = []
+    for day, filename in inputs:
+        instrumentation = Instrumentation(
+            trace_memory=not args.no_memory,
+            counters=args.count or HOT_FUNCTIONS.get(day, ()),
+            output_dir=args.profile,
+        )
+        challenges[day].instrument(filename, instrumentation, args.parts)
+        print(instrumentation.format_report())
+        reports.extend(instrumentation.reports)
+
+    # every phase creates the directory, but there may be no phase at all
+    Path(args.profile).mkdir(parents=True, exist_ok=True)
+    summary = Instrumentation(reports=reports)
+    summary.write_summary(str(Path(args.profile) / "summary.json"))
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    days = args.days or available_days()
+    for day in days:
+        if day not in available_days():
+            print(f"no solution found for day {day}", file=sys.stderr)
+            return 1
+    # only the requested days are imported
+    challenges = {day: load_challenge(day) for day in days}
+
+    inputs = []
+    for day in days:
+        for template in args.inputs:
+            filename = template.format(day=day)
+            if not Path(filename).is_file():
+                print(f"skipping day {day}: {filename} not found", file=sys.stderr)
+                continue
+            inputs.append((day, filename))
+
+    if args.profile:
+        return profile(challenges, inputs, args)
+
+    cache = ResultCache(args.cache, args.cache_size) if args.cache else None
+    if args.jobs == 1:
+        measurements = [
+            measurement
+            for day, filename in inputs
+            for measurement in run_challenge(
+                challenges[day], filename, args.parts, not args.no_memory, cache
+            )
+        ]
+    else:
+        measurements = run_parallel(
+            ((day, part, filename) for day, filename in inputs for part in args.parts),
+            args.jobs or None,
+            not args.no_memory,
+            cache,
+        )
+
+    print(format_table(measurements))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([asdict(m) for m in measurements], f, indent=2, default=int)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
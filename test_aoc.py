@@ -1,57 +1,269 @@
-from day1 import day1
-from day11 import day11
-from day2 import day2
-from day3 import day3
-from day4 import day4
-from day5 import day5
-from day6 import day6
-from day7 import day7
-from day8 import day8
-from day9 import day9
-from day10 import day10
-
-
-def test_day1():
+import itertools
+import json
+import pstats
+import random
+import shutil
+import subprocess
+import sys
+import tracemalloc
+from dataclasses import asdict
+
+import pytest
+
+from bench_aoc import PartBenchmark, find_regressions, fit_scaling_exponent
+from cache import ResultCache
+from generators import GENERATORS, generate, write_input
+from instrumentation import Instrumentation
+from runner import discover_challenges, main, run_challenge, run_parallel
+from utils import (
+    available_days,
+    extract_numbers,
+    extract_numbers_bulk,
+    iter_lines,
+    line_aligned_chunks,
+    load_challenge,
+)
+
+
+def test_day1(tmp_path):
+    import day1 as day1_module
+
+    day1 = load_challenge(1)
+
     assert day1.part1("input/day1_tiny.txt") == 142
     assert day1.part2("input/day1_tiny2.txt") == 281
 
     assert day1.part1("input/day1.txt") == 54708
     assert day1.part2("input/day1.txt") == 54087
 
+    assert day1_module.stream_part1("input/day1.txt") == 54708
+    assert day1_module.stream_part2("input/day1.txt") == 54087
+
+    # overlapping spelled digits, and a long line scanned from both ends only
+    assert day1_module.spelled_calibration_value("twone") == 21
+    assert day1_module.spelled_calibration_value("xoneightx") == 18
+    assert day1_module.spelled_calibration_value("seven" + "x" * 10**6 + "nine") == 79
+
+    assert day1_module.vectorized_part1("input/day1.txt") == 54708
+    assert day1_module.vectorized_part2("input/day1.txt") == 54087
+    assert day1_module.vectorized_part2("input/day1_tiny2.txt") == 281
+
+    assert day1_module.parallel_part1("input/day1.txt", max_workers=2) == 54708
+    assert day1_module.parallel_part2("input/day1.txt", max_workers=2) == 54087
+
+    # 0 is a digit for every backend, spelled out or not
+    filename = str(tmp_path / "day1.txt")
+    with open(filename, "w") as f:
+        f.write("a0b5c\nx1y0\nzero0nine\n")
+    assert day1_module.spelled_calibration_value("a0b5c") == 5
+    assert (
+        day1.part2(filename)
+        == day1_module.stream_part2(filename)
+        == day1_module.vectorized_part2(filename)
+        == day1_module.parallel_part2(filename, max_workers=2)
+        == 5 + 10 + 9
+    )
+    for num_chunks in (1, 3, 1000):
+        chunks = line_aligned_chunks("input/day1.txt", num_chunks)
+        assert [
+            line
+            for start, end in chunks
+            for line in iter_lines("input/day1.txt", start, end)
+        ] == list(iter_lines("input/day1.txt"))
+
 
 def test_day2():
+    import day2 as day2_module
+
+    day2 = load_challenge(2)
+
     assert day2.part1("input/day2_tiny.txt") == 8
     assert day2.part2("input/day2_tiny.txt") == 2286
 
     assert day2.part1("input/day2.txt") == 2541
     assert day2.part2("input/day2.txt") == 66016
 
+    assert day2_module.stream_part1("input/day2.txt") == 2541
+    assert day2_module.stream_part2("input/day2.txt") == 66016
+
+    tokens = day2_module.tokenize_games([b"Game 12: 3 blue, 4 red; 1 red, 2 green\n"])
+    assert list(tokens) == [(12, 0, 2, 3), (12, 0, 0, 4), (12, 1, 0, 1), (12, 1, 1, 2)]
+
+    games = day2_module.parse_file("input/day2_tiny.txt")
+    assert len(games.game_ids) == 5 and len(games.round_games) == 14
+    assert games.maximum_cubes()[0].tolist() == [4, 2, 6]
+    assert games.possible_id_sum((20, 20, 20)) == 15
+
+    games = day2_module.parse_file("input/day2.txt")
+    index = day2_module.BagLimitIndex.from_games(games)
+    assert index.query() == 2541
+    limits = [
+        (red, green, blue)
+        for red in range(0, 24, 3)
+        for green in (0, 9, 13, 30)
+        for blue in (5, 14)
+    ]
+    assert index.query_many(limits).tolist() == [
+        games.possible_id_sum(bag) for bag in limits
+    ]
+    index = day2_module.BagLimitIndex.from_games(games, max_table_cells=0)
+    assert index.query_many(limits).tolist() == [
+        games.possible_id_sum(bag) for bag in limits
+    ]
+
+    # quantities with thousands of distinct values do not build the dense table
+    rng = random.Random(2)
+    games = day2_module.GameColumns.from_tokens(
+        (game_id, 0, color, rng.randint(1, 3000))
+        for game_id in range(1, 20_001)
+        for color in range(3)
+    )
+    index = day2_module.BagLimitIndex.from_games(games)
+    assert index.id_sums is None
+    limits = [tuple(rng.randint(0, 3000) for _ in range(3)) for _ in range(200)]
+    assert index.query_many(limits).tolist() == [
+        games.possible_id_sum(bag) for bag in limits
+    ]
+
 
 def test_day3():
+    import day3 as day3_module
+
+    day3 = load_challenge(3)
+
     assert day3.part1("input/day3_tiny.txt") == 4361
     assert day3.part2("input/day3_tiny.txt") == 467835
 
     assert day3.part1("input/day3.txt") == 538046
     assert day3.part2("input/day3.txt") == 81709807
 
+    assert day3_module.stream_part1("input/day3.txt") == 538046
+    assert day3_module.stream_part2("input/day3.txt") == 81709807
+
+    # the same number above and below a star is still two part numbers
+    schematic = day3_module.SchematicIndex.from_lines(["12.", ".*.", "12."])
+    assert schematic.labels[1].tolist() == [-1, -1, -1, -1]
+    assert (schematic.part_number_sum(), schematic.gear_ratio_sum()) == (24, 144)
+    assert list(day3_module.stream_schematic(["12.", ".*.", "12."])) == [
+        (12, 0),
+        (0, 144),
+        (12, 0),
+    ]
+
+    # incremental updates agree with a full recompute after every edit
+    rng = random.Random(3)
+    schematic = day3_module.MutableSchematic.parse(generate(3, 12, seed=3))
+    for _ in range(300):
+        schematic[rng.randrange(12), rng.randrange(12)] = rng.choice("..0123456789*#")
+        index = day3_module.SchematicIndex.from_lines(
+            ["".join(row) for row in schematic.rows]
+        )
+        assert schematic.part_number_sum == index.part_number_sum()
+        assert schematic.gear_ratio_sum == index.gear_ratio_sum()
+
+    # negative indices count from the end, as they do for lists
+    schematic = day3_module.MutableSchematic(["......", "......", "12...."])
+    schematic[-1, -4] = "*"
+    assert schematic[2, 2] == "*" and schematic.part_number_sum == 12
+    with pytest.raises(IndexError):
+        schematic[-4, 0] = "*"
+
 
 def test_day4():
+    import day4 as day4_module
+
+    day4 = load_challenge(4)
+
     assert day4.part1("input/day4_tiny.txt") == 13
     assert day4.part2("input/day4_tiny.txt") == 30
 
     assert day4.part1("input/day4.txt") == 24160
     assert day4.part2("input/day4.txt") == 5659035
 
+    assert day4_module.stream_part1("input/day4.txt") == 24160
+    assert day4_module.stream_part2("input/day4.txt") == 5659035
+
+    assert day4_module.card_bitmasks("Card 1: 1 3 | 3 5") == (0b1010, 0b101000)
+    assert day4_module.card_bitmasks("Card 1: 7 3 7 | 3 100") == (0b11, 0b10)
+
+    # numbers far beyond 99 cost neither bits nor memory
+    rng = random.Random(4)
+    cards = [
+        f"Card {card}: {' '.join(map(str, rng.sample(range(200_000), 10)))}"
+        f" | {' '.join(map(str, rng.sample(range(200_000), 25)))} 199999 199999"
+        for card in range(1, 20_001)
+    ]
+    expected = [len(set.intersection(*day4_module.parse_card(card))) for card in cards]
+    assert [day4_module.count_matching_numbers(card) for card in cards] == expected
+    pile = "\n".join(cards).encode()
+    assert day4_module.count_matching_numbers_bulk(pile).tolist() == expected
+    pile = b"Card 1: 1 2 | 2 1\n\nCard 2: 3 | 4\nCard 3: 70 | 70 5"
+    assert day4_module.count_matching_numbers_bulk(pile).tolist() == [2, 0, 1]
+    assert day4_module.count_matching_numbers_bulk(b"").tolist() == []
+
+    # counts far beyond what could be simulated card by card stay exact
+    assert day4.solve_part2([1] * 1000) == 500500
+    instances = [1, 2]
+    for _ in range(198):
+        instances.append(1 + instances[-1] + instances[-2])
+    assert day4.solve_part2([2] * 200) == sum(instances) > 2**128
+
+    # only the window of pending copies is kept, whatever the length of the stream
+    with open("input/day4_tiny.txt") as f:
+        assert day4.solve_part2(day4_module.stream_card_matches(f)) == 30
+    tracemalloc.start()
+    assert (
+        day4.solve_part2(itertools.repeat(1, 10**5)) == 10**5 * (10**5 + 1) // 2
+    )
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak_memory < 10_000
+
 
 def test_day5():
+    import day5 as day5_module
+
+    day5 = load_challenge(5)
+
     assert day5.part1("input/day5_tiny.txt") == 35
     assert day5.part2("input/day5_tiny.txt") == 46
 
     assert day5.part1("input/day5.txt") == 403695602
     assert day5.part2("input/day5.txt") == 219529182
 
+    # intervals are split exactly where single values change range, overlaps included
+    mapping = day5_module.Mapping("seed", "soil")
+    mapping.extend(
+        day5_module.RangeMap(source, destination, length)
+        for source, destination, length in ((5, 50, 10), (10, 0, 3), (30, 20, 5))
+    )
+    images = mapping.map_intervals([(0, 40), (12, 14)])
+    assert sorted(
+        value for start, end in images for value in range(start, end)
+    ) == sorted(mapping.map(value) for value in [*range(40), 12, 13])
+
+    compiled = day5_module.CompiledMapping.from_mapping(mapping)
+    assert (compiled.starts, compiled.ends, compiled.offsets) == (
+        [5, 30],
+        [15, 35],
+        [45, -10],
+    )
+    assert [compiled.map(value) for value in range(40)] == [
+        mapping.map(value) for value in range(40)
+    ]
+    assert sorted(compiled.map_intervals([(0, 40), (12, 14)])) == sorted(images)
+
+    pipeline = day5_module.parse_file("input/day5_tiny.txt")
+    assert pipeline.interval_minimum() == min(
+        pipeline.map(seed)
+        for start, end in pipeline.gen_intervals()
+        for seed in range(start, end)
+    )
+
 
 def test_day6():
+    day6 = load_challenge(6)
+
     assert day6.part1("input/day6_tiny.txt") == 288
     assert day6.part2("input/day6_tiny.txt") == 71503
 
@@ -60,14 +272,23 @@ def test_day6():
 
 
 def test_day7():
+    import day7 as day7_module
+
+    day7 = load_challenge(7)
+
     assert day7.part1("input/day7_tiny.txt") == 6440
     assert day7.part2("input/day7_tiny.txt") == 5905
 
     assert day7.part1("input/day7.txt") == 251216224
     assert day7.part2("input/day7.txt") == 250825971
 
+    assert day7_module.stream_part1("input/day7.txt") == 251216224
+    assert day7_module.stream_part2("input/day7.txt") == 250825971
+
 
 def test_day8():
+    day8 = load_challenge(8)
+
     assert day8.part1("input/day8_tiny.txt") == 2
     assert day8.part2("input/day8_tiny2.txt") == 6
 
@@ -76,14 +297,32 @@ def test_day8():
 
 
 def test_day9():
+    import day9 as day9_module
+
+    day9 = load_challenge(9)
+
     assert day9.part1("input/day9_tiny.txt") == 114
     assert day9.part2("input/day9_tiny.txt") == 2
 
     assert day9.part1("input/day9.txt") == 1972648895
     assert day9.part2("input/day9.txt") == 919
 
+    assert day9_module.stream_part1("input/day9.txt") == 1972648895
+    assert day9_module.stream_part2("input/day9.txt") == 919
+
+    # long histories whose differences leave int64 stay exact
+    rng = random.Random(9)
+    history = [rng.randint(-(10**6), 10**6) for _ in range(60)]
+    histories = extract_numbers_bulk(" ".join(map(str, history)))
+    assert day9.solve_part1(histories) == day9_module.extrapolate_value(history)
+    assert day9.solve_part2(histories) == day9_module.extrapolate_value(
+        history, extrapolate_backward=True
+    )
+
 
 def test_day10():
+    day10 = load_challenge(10)
+
     assert day10.part1("input/day10_tiny1.txt") == 8
     assert day10.part2("input/day10_tiny1.txt") == 1
 
@@ -95,8 +334,175 @@ def test_day10():
 
 
 def test_day11():
+    day11 = load_challenge(11)
+
     assert day11.part1("input/day11_tiny.txt") == 374
     assert day11.part2("input/day11_tiny.txt") == 82000210
 
     assert day11.part1("input/day11.txt") == 9623138
     assert day11.part2("input/day11.txt") == 726820169514
+
+
+def test_runner():
+    assert available_days() == list(range(1, 12))
+    challenges = discover_challenges()
+    assert list(challenges) == list(range(1, 12))
+
+    # a single day imports neither the other days nor their heavy dependencies
+    script = (
+        "import sys, runner; runner.load_challenge(1).part1('input/day1_tiny.txt'); "
+        "print(sorted(m for m in ('numpy', 'termcolor', 'day6', 'day10') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    assert output.stdout.strip() == "[]"
+
+    # nor do the streaming paths of the days with NumPy solutions
+    script = (
+        "import sys, day2, day3, day9; day2.stream_part1('input/day2_tiny.txt'); "
+        "day3.stream_part2('input/day3_tiny.txt'); day9.stream_part1('input/day9.txt'); "
+        "print('numpy' in sys.modules)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    assert output.stdout.strip() == "False"
+
+    parse, part1, part2 = run_challenge(challenges[4], "input/day4_tiny.txt")
+    assert (parse.phase, parse.answer) == ("parse", None)
+    assert (part1.phase, part1.answer) == ("part1", 13)
+    assert (part2.phase, part2.answer) == ("part2", 30)
+    assert part2.wall_time >= 0 and part2.peak_memory > 0
+
+
+def test_solve_both():
+    day5, day7, day10 = map(load_challenge, (5, 7, 10))
+    assert day5.solve_both("input/day5_tiny.txt") == (35, 46)
+    assert day7.solve_both("input/day7_tiny.txt") == (6440, 5905)
+    assert day10.solve_both("input/day10_tiny2.txt") == (23, 4)
+
+
+def test_instrumentation(tmp_path):
+    import day5 as day5_module
+
+    day5 = load_challenge(5)
+    original_map = day5_module.CompiledMapping.map
+    instrumentation = Instrumentation(
+        counters=["day5.CompiledMapping.map"], output_dir=str(tmp_path)
+    )
+    assert day5.instrument("input/day5_tiny.txt", instrumentation) == [35, 46]
+    assert day5_module.CompiledMapping.map is original_map
+
+    parse, part1, part2 = instrumentation.reports
+    assert [parse.phase, part1.phase, part2.phase] == ["parse", "part1", "part2"]
+    assert parse.calls == {"day5.CompiledMapping.map": 0}
+    assert part1.calls["day5.CompiledMapping.map"] == 4 * 7
+    assert part2.peak_memory > 0 and part2.top_functions
+    assert pstats.Stats(part2.stats_file).total_calls > 0
+
+    instrumentation.write_summary(str(tmp_path / "summary.json"))
+    with open(tmp_path / "summary.json") as f:
+        assert [report["phase"] for report in json.load(f)] == [
+            "parse",
+            "part1",
+            "part2",
+        ]
+
+    # every input skipped still leaves an (empty) summary
+    profile_dir = tmp_path / "profiles"
+    assert main(["-d", "7", "--profile", str(profile_dir), "-i", "nosuch.txt"]) == 0
+    with open(profile_dir / "summary.json") as f:
+        assert json.load(f) == []
+
+
+def test_extract_numbers_bulk():
+    for day in (5, 9):
+        with open(f"input/day{day}.txt") as f:
+            data = f.read()
+        numbers, offsets = extract_numbers_bulk(data)
+        assert [
+            tuple(numbers[start:end]) for start, end in zip(offsets, offsets[1:])
+        ] == [extract_numbers(line) for line in data.splitlines()]
+
+    numbers, offsets = extract_numbers_bulk("a-1 2\n\n-30")
+    assert numbers.tolist() == [-1, 2, -30]
+    assert offsets.tolist() == [0, 2, 2, 3]
+
+
+def test_generators(tmp_path):
+    assert generate(7, 100, seed=1) == generate(7, 100, seed=1)
+    assert generate(7, 100, seed=1) != generate(7, 100, seed=2)
+
+    challenges = discover_challenges()
+    for day in GENERATORS:
+        filename = write_input(day, 8, str(tmp_path / f"day{day}.txt"))
+        assert challenges[day].part1(filename) >= 0
+
+
+def test_benchmark_regressions():
+    sizes = [1000, 2000, 4000]
+    assert round(fit_scaling_exponent(sizes, [0.1, 0.2, 0.4]), 6) == 1
+    assert round(fit_scaling_exponent(sizes, [0.1, 0.4, 1.6]), 6) == 2
+
+    baseline = {
+        "day4.part2": asdict(PartBenchmark(4, 2, sizes, sizes, [0.1, 0.2, 0.4], 1.0))
+    }
+    same = PartBenchmark(4, 2, sizes, sizes, [0.11, 0.2, 0.4], 1.0)
+    slower = PartBenchmark(4, 2, sizes, sizes, [0.1, 0.2, 0.6], 1.0)
+    quadratic = PartBenchmark(4, 2, sizes, sizes, [0.1, 0.4, 1.6], 2.0)
+    assert find_regressions([same], baseline) == []
+    assert len(find_regressions([slower], baseline)) == 1
+    assert len(find_regressions([quadratic], baseline)) == 3
+
+
+def test_runner_parallel():
+    jobs = [
+        (day, part, f"input/day{day}_tiny.txt") for day in (4, 7) for part in (1, 2)
+    ]
+    answers = {(m.day, m.phase): m.answer for m in run_parallel(jobs, max_workers=2)}
+    assert answers == {
+        (4, "parse (part1)"): None,
+        (4, "parse (part2)"): None,
+        (4, "part1"): 13,
+        (4, "part2"): 30,
+        (7, "parse (part1)"): None,
+        (7, "parse (part2)"): None,
+        (7, "part1"): 6440,
+        (7, "part2"): 5905,
+    }
+
+
+def test_result_cache(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "cache"))
+    filename = str(tmp_path / "day4.txt")
+    shutil.copy("input/day4_tiny.txt", filename)
+
+    assert cache.get(4, 1, filename) is None
+    assert cache.solve(4, 1, filename, load_challenge(4).part1) == 13
+    assert cache.solve(4, 1, filename, lambda _: 0) == 13
+
+    # changing the input or the solution source misses the cache
+    with open(filename, "a") as f:
+        f.write("Card 7: 1 2 | 3 4\n")
+    assert cache.get(4, 1, filename) is None
+    cache.put(4, 1, filename, 13)
+    monkeypatch.setattr("cache.solution_digest", lambda day: "edited")
+    assert cache.get(4, 1, filename) is None
+
+    # the least recently used entries go once the cache is full
+    cache.max_bytes = 200
+    for part in range(10):
+        cache.put(4, part, filename, part)
+    assert cache.get(4, 9, filename) == 9
+    assert cache.get(4, 0, filename) is None
+
+    # a run hashes its input once for all of its lookups and stores
+    cache.clear()
+    cache.max_bytes = 1 << 20
+    digests = []
+    monkeypatch.setattr("cache.file_digest", lambda name: digests.append(name) or "")
+    for _ in range(2):
+        measurements = run_challenge(load_challenge(4), filename, cache=cache)
+        assert [m.answer for m in measurements if m.phase != "parse"] == [13, 31]
+    assert all(m.cached for m in measurements) and digests == [filename, filename]
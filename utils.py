@@ -1,14 +1,180 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
-from typing import Callable
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
+import importlib
+import mmap
+import os
 import re
 
+if TYPE_CHECKING:
+    import numpy as np
+
+SOLUTIONS_DIR = Path(__file__).parent
+
 
 @dataclass
 class AOCChallenge[ReturnType]:
     day: int
     part1: Callable[[str], ReturnType]
     part2: Callable[[str], ReturnType]
+    # optional split of each part into a parse stage shared by both parts and a solve stage
+    parse: Callable[[str], Any] | None = None
+    solve_part1: Callable[[Any], ReturnType] | None = None
+    solve_part2: Callable[[Any], ReturnType] | None = None
+
+    def __post_init__(self):
+        if self.parse is not None and (
+            self.solve_part1 is None or self.solve_part2 is None
+        ):
+            raise ValueError(f"day {self.day} has a parse stage but no solvers")
+
+    def solve_both(self, filename: str) -> tuple[ReturnType, ReturnType]:
+        if self.parse is None:
+            return self.part1(filename), self.part2(filename)
+        parsed = self.parse(filename)
+        return self.solve_part1(parsed), self.solve_part2(parsed)
+
+    def instrument(
+        self, filename: str, instrumentation, parts: Iterable[int] = (1, 2)
+    ) -> list[ReturnType]:
+        """Runs the parts with every phase under an instrumentation.Instrumentation."""
+        if self.parse is None:
+            return [
+                instrumentation.run(
+                    self.day,
+                    f"part{part}",
+                    filename,
+                    getattr(self, f"part{part}"),
+                    filename,
+                )
+                for part in parts
+            ]
+        parsed = instrumentation.run(self.day, "parse", filename, self.parse, filename)
+        return [
+            instrumentation.run(
+                self.day,
+                f"part{part}",
+                filename,
+                getattr(self, f"solve_part{part}"),
+                parsed,
+            )
+            for part in parts
+        ]
+
+
+def available_days() -> list[int]:
+    """Days that have a solution module, found without importing any of them."""
+    return sorted(
+        int(path.stem.removeprefix("day"))
+        for path in SOLUTIONS_DIR.glob("day*.py")
+        if path.stem.removeprefix("day").isdigit()
+    )
+
+
+@cache
+def load_challenge(day: int) -> AOCChallenge:
+    """Imports the module of a single day, only when its challenge is requested."""
+    module = importlib.import_module(f"day{day}")
+    for value in vars(module).values():
+        if isinstance(value, AOCChallenge) and value.day == day:
+            return value
+    raise LookupError(f"day{day}.py defines no AOCChallenge for day {day}")
 
 
 def extract_numbers(s: str, syntax=re.compile(r"-?\d+")) -> tuple[int]:
     return tuple(map(int, syntax.findall(s)))
+
+
+def digit_runs(buffer: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every run of ASCII digits of a uint8 array, as the [starts, ends) positions of
+    the runs and their unsigned int64 values.
+    """
+    import numpy as np
+
+    is_digit = (buffer >= ord("0")) & (buffer <= ord("9"))
+    edges = np.flatnonzero(np.diff(is_digit, prepend=False, append=False))
+    starts, ends = edges[::2], edges[1::2]
+    lengths = ends - starts
+    if not len(lengths):
+        return starts, ends, np.zeros(0, dtype=np.int64)
+    if lengths.max() > 18:
+        raise OverflowError("numbers with more than 18 digits do not fit in int64")
+
+    digit_positions = np.flatnonzero(is_digit)
+    powers = np.repeat(ends - 1, lengths) - digit_positions
+    weighted = (buffer[digit_positions] - ord("0")).astype(np.int64) * np.power(
+        10, powers, dtype=np.int64
+    )
+    return starts, ends, np.add.reduceat(weighted, np.cumsum(lengths) - lengths)
+
+
+def extract_numbers_bulk(data: str | bytes) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized extract_numbers over a whole buffer.
+
+    Returns every signed integer of the buffer as one int64 array, and the row offsets:
+    the numbers of line i are numbers[offsets[i]:offsets[i + 1]].
+    """
+    import numpy as np
+
+    if isinstance(data, str):
+        data = data.encode()
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    starts, _, numbers = digit_runs(buffer)
+    negative = np.zeros(len(starts), dtype=bool)
+    negative[starts > 0] = buffer[starts[starts > 0] - 1] == ord("-")
+    numbers[negative] *= -1
+
+    newlines = np.flatnonzero(buffer == ord("\n"))
+    num_lines = len(newlines) + (len(buffer) > 0 and buffer[-1] != ord("\n"))
+    lines_of_numbers = np.searchsorted(newlines, starts)
+    offsets = np.searchsorted(lines_of_numbers, np.arange(num_lines + 1))
+    return numbers, offsets
+
+
+def iter_lines(
+    filename: str, start: int = 0, end: int | None = None
+) -> Iterator[str]:
+    """
+    Yields the lines of a file one at a time, without their line endings.
+
+    The file is memory-mapped instead of read, so only the current line is ever
+    copied into Python memory, whatever the size of the file. With start and end,
+    only the lines that start in the byte range [start, end) are read.
+    """
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = len(mapped) if end is None else end
+            mapped.seek(start)
+            while mapped.tell() < end and (line := mapped.readline()):
+                yield line.rstrip(b"\r\n").decode()
+
+
+def line_aligned_chunks(filename: str, num_chunks: int) -> list[tuple[int, int]]:
+    """
+    Splits a file into about num_chunks byte ranges [start, end) that each hold
+    whole lines, for iter_lines(filename, start, end).
+    """
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            boundaries = [0]
+            for chunk in range(1, num_chunks):
+                # a chunk ends after the first newline past its share of the file
+                share = max(size * chunk // num_chunks, boundaries[-1])
+                newline = mapped.find(b"\n", share)
+                if newline == -1:
+                    break
+                if newline + 1 > boundaries[-1]:
+                    boundaries.append(newline + 1)
+    if boundaries[-1] != size:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))